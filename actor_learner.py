@@ -0,0 +1,269 @@
+# actor_learner.py
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import queue
+import time
+from collections import deque
+import numpy as np
+import torch
+from torch.nn.utils import parameters_to_vector, vector_to_parameters
+from flying_bird_vec_env import OBS_DIM
+
+NUM_ACTIONS = 2
+NUM_ACTORS = 2  # Default number of actor processes
+ACTOR_EPSILON = 0.4  # Actor i explores with ACTOR_EPSILON ** (1 + ACTOR_EPSILON_ALPHA * i / (N - 1)) (Ape-X)
+ACTOR_EPSILON_ALPHA = 7
+CHUNK_SIZE = 64  # Transitions an actor collects before sending them to the learner
+MAX_CHUNKS_IN_FLIGHT = 64  # Chunks queued for the learner before actors block (back-pressure)
+BROADCAST_EVERY = 50  # Learner updates between weight broadcasts to the actors
+SYNC_EVERY = 100  # Actor steps between checks for newly broadcast weights
+
+
+class SharedWeights:
+    """A model's parameters in one shared memory block, published by the learner and polled by the actors.
+
+    The block holds a version counter followed by the flattened float32
+    parameters. publish() makes the version odd while it writes and even again
+    when done (a seqlock), so an actor that reads the same even version before
+    and after copying the parameters knows it did not copy a half-written update.
+    """
+
+    def __init__(self, num_params: int, name=None):
+        """Create the block (name=None) or attach to an existing one by name"""
+        size = np.dtype(np.int64).itemsize + num_params * np.dtype(np.float32).itemsize
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.version = np.ndarray((1,), dtype=np.int64, buffer=self.shm.buf)
+        self.params = np.ndarray((num_params,), dtype=np.float32, buffer=self.shm.buf,
+                                 offset=self.version.nbytes)
+
+    def publish(self, model):
+        """Write the parameters of model to the block"""
+        self.version[0] += 1
+        self.params[:] = parameters_to_vector(model.parameters()).detach().cpu().numpy()
+        self.version[0] += 1
+
+    def fetch(self, model, known_version: int):
+        """Load the published parameters into model if they are newer than known_version; return its version"""
+        version = int(self.version[0])
+        if version == known_version or version % 2:
+            return known_version
+        params = torch.from_numpy(self.params.copy())
+        if int(self.version[0]) != version:
+            return known_version  # Overwritten while copying; try again at the next sync
+        vector_to_parameters(params, model.parameters())
+        return version
+
+    def close(self):
+        """Drop the views and detach from the block"""
+        self.version = self.params = None
+        self.shm.close()
+
+
+def actor_epsilons(num_actors: int):
+    """Fixed exploration rate of every actor, from ACTOR_EPSILON down to ACTOR_EPSILON ** (1 + ACTOR_EPSILON_ALPHA)"""
+    if num_actors == 1:
+        return [ACTOR_EPSILON]
+    return [ACTOR_EPSILON ** (1 + ACTOR_EPSILON_ALPHA * i / (num_actors - 1)) for i in range(num_actors)]
+
+
+def _put(transitions, item, stop):
+    """Put item on the queue, giving up once stop is set"""
+    while not stop.is_set():
+        try:
+            transitions.put(item, timeout=0.1)
+            return
+        except queue.Full:
+            pass
+
+
+def _actor(rank: int, seed, epsilon: float, weights_name: str, num_params: int, transitions, stop, frame_skip: int):
+    """Actor process loop: play epsilon-greedy with the latest broadcast weights and send transitions in chunks"""
+    from flying_bird_env import FlyingBirdEnv
+    from dqn_network import DQN
+    from dqn_actor import DQNActor
+
+    torch.set_num_threads(1)  # Actors share the CPUs with each other and the learner
+    transitions.cancel_join_thread()  # Don't hang at exit on chunks the learner will never read
+    env_seed, actor_seed = seed.spawn(2)
+    weights = SharedWeights(num_params, name=weights_name)
+    env = FlyingBirdEnv(render=False, seed=env_seed, frame_skip=frame_skip)
+    model = DQN(OBS_DIM, NUM_ACTIONS)
+    actor = DQNActor(model, NUM_ACTIONS, 'cpu', seed=actor_seed)
+    version = weights.fetch(model, -1)
+
+    states = np.empty((CHUNK_SIZE, OBS_DIM), dtype=np.float32)
+    actions = np.empty(CHUNK_SIZE, dtype=np.int64)
+    rewards = np.empty(CHUNK_SIZE, dtype=np.float32)
+    next_states = np.empty((CHUNK_SIZE, OBS_DIM), dtype=np.float32)
+    dones = np.empty(CHUNK_SIZE, dtype=np.float32)
+    n = 0
+    steps = 0
+    finished = []  # Rewards of the episodes finished since the last chunk
+    episode_reward = 0
+    state = env.reset()
+    try:
+        while not stop.is_set():
+            action = int(actor.act(state, epsilon)[0])
+            next_state, reward, done, _ = env.step(action)
+            states[n], actions[n], rewards[n], next_states[n], dones[n] = state, action, reward, next_state, done
+            n += 1
+            steps += 1
+            episode_reward += reward
+            if done:
+                finished.append(episode_reward)
+                episode_reward = 0
+                state = env.reset()
+            else:
+                state = next_state
+
+            if n == CHUNK_SIZE:
+                _put(transitions, (rank, states.copy(), actions.copy(), rewards.copy(), next_states.copy(),
+                                   dones.copy(), finished), stop)
+                finished = []
+                n = 0
+            if steps % SYNC_EVERY == 0:
+                version = weights.fetch(model, version)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        env.close()
+        weights.close()
+
+
+def train_async(num_actors: int = NUM_ACTORS, max_episodes=None, buffer_size=None, metrics_dir: str = 'metrics',
+                broadcast_every: int = BROADCAST_EVERY, frame_skip: int = 1, seed=None, start_method=None,
+                model_path: str = 'dqn_model.pth'):
+    """Train a DQN with num_actors actor processes feeding one learner (this process).
+
+    Every actor runs its own FlyingBirdEnv with a fixed epsilon (see
+    actor_epsilons) and streams transitions in chunks through a bounded queue
+    into the learner's replay buffer. The learner moves whatever has arrived
+    into the buffer, does one update and repeats, so it never waits for an env
+    step; every broadcast_every updates it publishes its weights to the actors
+    through shared memory. Training stops after max_episodes episodes
+    (default train_dqn.MAX_EPISODES) across all actors, and the model is saved
+    to model_path. Returns a summary of the run like train_dqn.train().
+    """
+    # Hyperparameters and the loss are shared with the synchronous loop
+    from train_dqn import (compute_td_loss, hard_update, device, BATCH_SIZE, BUFFER_SIZE, LEARNING_RATE,
+                           MAX_EPISODES, METRICS_AGGREGATE, TARGET_UPDATE)
+    from dqn_network import DQN
+    from replay_buffer import ReplayBuffer
+    from metrics import MetricsWriter
+
+    max_episodes = MAX_EPISODES if max_episodes is None else max_episodes
+    model = DQN(OBS_DIM, NUM_ACTIONS).to(device)
+    target_model = DQN(OBS_DIM, NUM_ACTIONS).to(device)
+    target_model.load_state_dict(model.state_dict())
+    optimizer = torch.optim.Adam(model.parameters(), lr=LEARNING_RATE)
+    replay_buffer = ReplayBuffer(BUFFER_SIZE if buffer_size is None else buffer_size)
+    metrics = MetricsWriter(metrics_dir, aggregate_every=METRICS_AGGREGATE, device=device)
+
+    num_params = sum(p.numel() for p in model.parameters())
+    weights = SharedWeights(num_params)
+    weights.publish(model)
+
+    # 1. Start the actors, each with its own seeds and exploration rate
+    ctx = mp.get_context(start_method)
+    transitions = ctx.Queue(maxsize=MAX_CHUNKS_IN_FLIGHT)
+    stop = ctx.Event()
+    epsilons = actor_epsilons(num_actors)
+    seeds = np.random.SeedSequence(seed).spawn(num_actors)
+    processes = []
+    for rank in range(num_actors):
+        process = ctx.Process(
+            target=_actor,
+            args=(rank, seeds[rank], epsilons[rank], weights.shm.name, num_params, transitions, stop, frame_skip),
+            daemon=True,
+        )
+        process.start()
+        processes.append(process)
+
+    print(f"Training started with {num_actors} actors (epsilons {', '.join(f'{e:.3g}' for e in epsilons)})...")
+    start = time.perf_counter()
+    episode = 0
+    frame_idx = 0
+    updates = 0
+    cumulative_reward = 0
+    recent_rewards = deque(maxlen=100)
+    try:
+        while episode < max_episodes:
+            # 2. Actors only stop when told to, so one that has exited crashed
+            for rank, process in enumerate(processes):
+                if not process.is_alive():
+                    raise RuntimeError(f"actor {rank} exited with code {process.exitcode}")
+
+            # 3. Move the chunks that have arrived into the replay buffer; wait only while there is too little to learn from
+            block = replay_buffer.size() <= BATCH_SIZE
+            for _ in range(MAX_CHUNKS_IN_FLIGHT):
+                try:
+                    rank, *chunk, finished = transitions.get(block=block, timeout=1.0)
+                except queue.Empty:
+                    break
+                block = False
+                replay_buffer.add_batch(*chunk)
+                frame_idx += len(chunk[0])
+                for episode_reward in finished:
+                    recent_rewards.append(episode_reward)
+                    cumulative_reward += episode_reward
+                    steps_per_second = frame_idx / (time.perf_counter() - start)
+                    metrics.log_episode(episode, frame_idx, episode_reward, cumulative_reward, epsilons[rank],
+                                        steps_per_second)
+                    episode += 1
+                    if episode % 100 == 0:
+                        print(f"Episode {episode}, Mean reward (last 100): {np.mean(recent_rewards):.1f}, "
+                              f"Steps/s: {steps_per_second:.1f}, Updates: {updates}")
+
+            # 4. One learner update, then sync the target network and broadcast the weights when due
+            if replay_buffer.size() > BATCH_SIZE:
+                loss, _ = compute_td_loss(replay_buffer.sample(BATCH_SIZE), model, target_model, optimizer)
+                metrics.log_loss(loss)
+                updates += 1
+                if updates % TARGET_UPDATE == 0:
+                    hard_update(target_model, model)
+                if updates % broadcast_every == 0:
+                    weights.publish(model)
+    finally:
+        # 5. Stop the actors; drain the queue so none stays blocked on a full one
+        stop.set()
+        deadline = time.perf_counter() + 5.0
+        while any(process.is_alive() for process in processes) and time.perf_counter() < deadline:
+            try:
+                transitions.get(timeout=0.05)
+            except queue.Empty:
+                pass
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+            process.join()
+        transitions.close()
+        weights.close()
+        weights.shm.unlink()
+        metrics.close()
+
+    elapsed = time.perf_counter() - start
+    torch.save(model.state_dict(), model_path)
+    print(f"Training finished: {frame_idx} steps at {frame_idx / elapsed:.1f} steps/s, "
+          f"{updates} updates at {updates / elapsed:.1f} updates/s")
+    return {
+        'episodes': episode,
+        'steps': frame_idx,
+        'steps_per_second': frame_idx / elapsed,
+        'updates': updates,
+        'updates_per_second': updates / elapsed,
+        'mean_reward_last_100': float(np.mean(recent_rewards)) if recent_rewards else 0.0,
+    }
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    for num_actors in sorted({1, 2, mp.cpu_count()}):
+        with tempfile.TemporaryDirectory() as directory:
+            summary = train_async(num_actors, max_episodes=200, metrics_dir=directory,
+                                  model_path=f'{directory}/dqn_model.pth', seed=0)
+        print(f"{num_actors} actors: {summary['steps_per_second']:,.0f} env steps/s, "
+              f"{summary['updates_per_second']:,.0f} updates/s")
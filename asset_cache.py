@@ -0,0 +1,49 @@
+# asset_cache.py
+import pygame
+
+# Converted surfaces depend on the display's pixel format and sounds on the
+# mixer, so each cache is emptied when the display it was built for changes or
+# the mixer has to be initialized again (e.g. after pygame.quit()).
+_images = {}
+_images_display = None
+_sounds = {}
+
+
+def load_image(path: str, scale=None):
+    """Return the image at path, scaled and converted for the current display, loading it only once"""
+    global _images_display
+    display = pygame.display.get_surface()
+    if display is not _images_display:
+        _images.clear()
+        _images_display = display
+
+    key = (path, scale)
+    image = _images.get(key)
+    if image is None:
+        image = pygame.image.load(path)
+        image = image.convert_alpha() if display is not None else image
+        if scale is not None:
+            image = pygame.transform.scale(image, scale)
+        _images[key] = image
+    return image
+
+
+def load_sound(path: str):
+    """Return the sound at path, initializing the mixer and loading the file only once"""
+    if not pygame.mixer.get_init():
+        pygame.mixer.init()
+        _sounds.clear()
+
+    sound = _sounds.get(path)
+    if sound is None:
+        sound = pygame.mixer.Sound(path)
+        _sounds[path] = sound
+    return sound
+
+
+def clear():
+    """Forget every cached image and sound"""
+    global _images_display
+    _images.clear()
+    _sounds.clear()
+    _images_display = None
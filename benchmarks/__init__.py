@@ -0,0 +1,10 @@
+"""Benchmarks for the training hot paths: env stepping, replay sampling and learner updates.
+
+Run from the repository root:
+
+    python -m benchmarks.run                    # run everything, write benchmarks/results.json
+    python -m benchmarks.run --quick --only env,replay
+    python -m benchmarks.run --save-baseline    # record the current numbers as the baseline
+    python -m benchmarks.run --baseline benchmarks/baseline.json --threshold 0.1
+    python -m benchmarks.startup                # cold-start import budgets of the headless modules
+"""
@@ -0,0 +1,245 @@
+# benchmarks/cases.py
+import contextlib
+import io
+import os
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+import config
+
+# Transition shape used to fill the replay buffers
+STATE_DIM = 5
+
+
+class Case:
+    """One benchmark: setup() builds the state, step(state) is the timed unit of work.
+
+    units_per_step says how many steps/samples/updates one call of step() performs,
+    so the reported rate is in those units per second.
+    """
+
+    def __init__(self, name: str, group: str, unit: str, setup, step, iterations: int, units_per_step: int = 1,
+                 teardown=None):
+        self.name = name
+        self.group = group
+        self.unit = unit
+        self.setup = setup
+        self.step = step
+        self.iterations = iterations
+        self.units_per_step = units_per_step
+        self.teardown = teardown
+
+    def run(self, quick: bool = False):
+        """Run the case and return its metrics.
+
+        Peak memory is measured with tracemalloc over setup plus a few warm-up
+        steps (it covers Python and NumPy allocations, not torch's allocator);
+        the timed loop runs afterwards without tracing.
+        """
+        tracemalloc.start()
+        try:
+            state = self.setup()
+        except BaseException:
+            tracemalloc.stop()
+            raise
+        try:
+            for _ in range(min(10, self.iterations)):
+                self.step(state)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            iterations = max(1, self.iterations // 10) if quick else self.iterations
+            start = time.perf_counter()
+            for _ in range(iterations):
+                self.step(state)
+            elapsed = time.perf_counter() - start
+        finally:
+            if tracemalloc.is_tracing():
+                tracemalloc.stop()
+            if self.teardown is not None:
+                self.teardown(state)
+
+        return {
+            'group': self.group,
+            'unit': self.unit,
+            'rate': iterations * self.units_per_step / elapsed,
+            'seconds': elapsed,
+            'iterations': iterations,
+            'peak_memory_mb': peak / 2 ** 20,
+        }
+
+
+def _fill(buffer, size: int):
+    """Fill a replay buffer with size random transitions"""
+    buffer.add_batch(np.random.rand(size, STATE_DIM), np.random.randint(0, 2, size), np.random.rand(size),
+                     np.random.rand(size, STATE_DIM), np.random.rand(size) < 0.01)
+    return buffer
+
+
+def env_cases():
+    """Scalar env (headless and rendered) and vectorized env stepping"""
+    from flying_bird_env import FlyingBirdEnv
+    from flying_bird_vec_env import FlyingBirdVecEnv
+
+    def scalar_step(env):
+        _, _, done, _ = env.step(np.random.randint(2))
+        if done:
+            env.reset()
+
+    def rendered_setup(render_fps=None):
+        # Render as fast as possible: without render_fps, FlyingBirdEnv.render() ticks its clock at config.FPS
+        os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+        saved_fps, config.FPS = config.FPS, 0
+        try:
+            return FlyingBirdEnv(render=True, render_fps=render_fps), saved_fps
+        except BaseException:
+            config.FPS = saved_fps
+            raise
+
+    def rendered_step(state):
+        env, _ = state
+        scalar_step(env)
+        env.render()
+
+    def rendered_teardown(state):
+        env, saved_fps = state
+        config.FPS = saved_fps
+        env.close()
+
+    cases = [
+        Case('env/scalar_headless', 'env', 'steps/s', lambda: FlyingBirdEnv(render=False), scalar_step, 20000,
+             teardown=lambda env: env.close()),
+        Case('env/scalar_frame_skip_4', 'env', 'frames/s', lambda: FlyingBirdEnv(render=False, frame_skip=4),
+             scalar_step, 20000, units_per_step=4, teardown=lambda env: env.close()),
+        Case('env/scalar_rendered', 'env', 'steps/s', rendered_setup, rendered_step, 2000,
+             teardown=rendered_teardown),
+        Case('env/scalar_rendered_30fps', 'env', 'steps/s', lambda: rendered_setup(render_fps=30), rendered_step,
+             20000, teardown=rendered_teardown),
+    ]
+    for num_envs in (64, 1024):
+        cases.append(Case(
+            f'env/vec_{num_envs}', 'env', 'steps/s', lambda n=num_envs: FlyingBirdVecEnv(n, seed=0),
+            lambda env: env.step(np.random.randint(0, 2, size=env.num_envs)), 2000, units_per_step=num_envs))
+    return cases
+
+
+def replay_cases():
+    """Uniform, prioritized and tensor replay sampling at several buffer and batch sizes"""
+    from replay_buffer import ReplayBuffer, PrioritizedReplayBuffer
+    from tensor_replay_buffer import TensorReplayBuffer
+
+    def prioritized_step(state):
+        buffer, batch_size = state
+        batch = buffer.sample(batch_size)
+        buffer.update_priorities(batch[-1], np.random.rand(batch_size))
+
+    cases = []
+    for size in (10000, 100000, 1000000):
+        for batch_size in (32, 64, 256):
+            for kind, cls, step in (
+                ('uniform', ReplayBuffer, lambda s: s[0].sample(s[1])),
+                ('prioritized', PrioritizedReplayBuffer, prioritized_step),
+                ('tensor', TensorReplayBuffer, lambda s: s[0].sample(s[1])),
+            ):
+                cases.append(Case(
+                    f'replay/{kind}_size{size}_batch{batch_size}', 'replay', 'samples/s',
+                    lambda cls=cls, size=size, batch_size=batch_size: (_fill(cls(size), size), batch_size),
+                    step, 2000, units_per_step=batch_size))
+    return cases
+
+
+def learner_cases():
+    """compute_td_loss updates per second at several batch sizes, eager and compiled, and target network syncs"""
+    import torch
+    import torch.optim as optim
+    import train_dqn
+    from dqn_network import DQN
+    from replay_buffer import ReplayBuffer
+
+    def setup(batch_size):
+        model = DQN(STATE_DIM, 2).to(train_dqn.device)
+        target_model = DQN(STATE_DIM, 2).to(train_dqn.device)
+        optimizer = optim.Adam(model.parameters(), lr=train_dqn.LEARNING_RATE)
+        return _fill(ReplayBuffer(100000), 100000), batch_size, model, target_model, optimizer
+
+    def step(state):
+        buffer, batch_size, model, target_model, optimizer = state
+        train_dqn.compute_td_loss(buffer.sample(batch_size), model, target_model, optimizer)
+
+    def compiled_setup(batch_size):
+        # Compiling happens on the first call, so it is done here rather than inside the timed steps
+        state = setup(batch_size) + (torch.compile(train_dqn.td_loss),)
+        compiled_step(state)
+        return state
+
+    def compiled_step(state):
+        buffer, batch_size, model, target_model, optimizer, loss_fn = state
+        train_dqn.compute_td_loss(buffer.sample(batch_size), model, target_model, optimizer, loss_fn=loss_fn)
+
+    def networks():
+        return DQN(STATE_DIM, 2).to(train_dqn.device), DQN(STATE_DIM, 2).to(train_dqn.device)
+
+    cases = [Case(f'learner/td_loss_batch{batch_size}', 'learner', 'updates/s',
+                  lambda b=batch_size: setup(b), step, 1000)
+             for batch_size in (32, 64, 256)]
+    cases.append(Case('learner/td_loss_batch64_compiled', 'learner', 'updates/s',
+                      lambda: compiled_setup(64), compiled_step, 1000))
+    cases.append(Case('learner/target_load_state_dict', 'learner', 'syncs/s', networks,
+                      lambda nets: nets[1].load_state_dict(nets[0].state_dict()), 5000))
+    cases.append(Case('learner/target_hard_update', 'learner', 'syncs/s', networks,
+                      lambda nets: train_dqn.hard_update(nets[1], nets[0]), 5000))
+    cases.append(Case('learner/target_soft_update', 'learner', 'syncs/s', networks,
+                      lambda nets: train_dqn.soft_update(nets[1], nets[0], 0.005), 5000))
+    return cases
+
+
+class TrainCase(Case):
+    """The full headless train() loop; it decides its own step count, so the rate comes from its summary"""
+
+    def __init__(self, name: str, episodes: int):
+        super(TrainCase, self).__init__(name, 'train', 'steps/s', None, None, episodes)
+
+    def _train(self, episodes: int):
+        """Run train() for the given number of episodes in a scratch directory and return its summary"""
+        from train_dqn import train
+
+        # Write into a scratch directory so the benchmark does not overwrite dqn_model.pth or the metrics log
+        with tempfile.TemporaryDirectory() as workdir, contextlib.redirect_stdout(io.StringIO()):
+            return train(render=False, max_episodes=episodes, metrics_dir=os.path.join(workdir, 'metrics'),
+                         checkpoint_dir=os.path.join(workdir, 'checkpoints'),
+                         model_path=os.path.join(workdir, 'dqn_model.pth'), plot=False)
+
+    def run(self, quick: bool = False):
+        """Time a full run, then trace memory over a short one"""
+        episodes = max(1, self.iterations // 10) if quick else self.iterations
+        start = time.perf_counter()
+        summary = self._train(episodes)
+        elapsed = time.perf_counter() - start
+
+        tracemalloc.start()
+        self._train(max(1, episodes // 10))
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        return {
+            'group': self.group,
+            'unit': self.unit,
+            'rate': summary['steps'] / elapsed,
+            'seconds': elapsed,
+            'iterations': summary['steps'],
+            'peak_memory_mb': peak / 2 ** 20,
+        }
+
+
+def train_cases():
+    """The full headless train() loop, in env steps per second"""
+    return [TrainCase('train/headless_loop', episodes=50)]
+
+
+GROUPS = {
+    'env': env_cases,
+    'replay': replay_cases,
+    'learner': learner_cases,
+    'train': train_cases,
+}
@@ -0,0 +1,116 @@
+# benchmarks/run.py
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.cases import GROUPS
+
+DEFAULT_OUTPUT = os.path.join('benchmarks', 'results.json')
+DEFAULT_BASELINE = os.path.join('benchmarks', 'baseline.json')
+
+
+def environment_info():
+    """Describe the machine and library versions the numbers were taken on"""
+    import torch
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'torch': torch.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'torch_threads': torch.get_num_threads(),
+    }
+
+
+def run_benchmarks(groups, quick: bool = False, name_filter=None):
+    """Run every case in the selected groups and return {case name: metrics}"""
+    results = {}
+    for group in groups:
+        for case in GROUPS[group]():
+            if name_filter and name_filter not in case.name:
+                continue
+            try:
+                metrics = case.run(quick=quick)
+            except Exception as error:  # e.g. no display or audio device for the rendered env
+                results[case.name] = {'group': case.group, 'unit': case.unit, 'skipped': f'{type(error).__name__}: {error}'}
+                print(f"{case.name:<45} skipped ({type(error).__name__}: {error})")
+                continue
+            results[case.name] = metrics
+            print(f"{case.name:<45} {metrics['rate']:>14,.0f} {metrics['unit']:<10} peak {metrics['peak_memory_mb']:8.1f} MB")
+    return results
+
+
+def compare(results, baseline, threshold: float, memory_threshold: float):
+    """Return the regressions of results against baseline as human-readable lines.
+
+    A case regresses if its rate drops by more than threshold (a fraction) or
+    its peak memory grows by more than memory_threshold.
+    """
+    regressions = []
+    for name, base in baseline.items():
+        current = results.get(name)
+        if current is None or 'skipped' in current or 'skipped' in base:
+            continue
+        ratio = current['rate'] / base['rate']
+        if ratio < 1.0 - threshold:
+            regressions.append(f"{name}: {current['rate']:,.0f} {current['unit']} vs baseline "
+                               f"{base['rate']:,.0f} ({(ratio - 1) * 100:+.1f}%)")
+        if base['peak_memory_mb'] > 0 and current['peak_memory_mb'] > base['peak_memory_mb'] * (1.0 + memory_threshold):
+            regressions.append(f"{name}: peak memory {current['peak_memory_mb']:.1f} MB vs baseline "
+                               f"{base['peak_memory_mb']:.1f} MB")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark env stepping, replay sampling and learner updates")
+    parser.add_argument('--only', default=','.join(GROUPS), help=f"Comma-separated groups to run ({', '.join(GROUPS)})")
+    parser.add_argument('--filter', default=None, help="Only run cases whose name contains this string")
+    parser.add_argument('--quick', action='store_true', help="Run a tenth of the iterations")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help="Where to write the results JSON")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="Baseline JSON to compare against")
+    parser.add_argument('--save-baseline', action='store_true', help="Write the results to the baseline file as well")
+    parser.add_argument('--threshold', type=float, default=0.10, help="Allowed fractional drop in rate")
+    parser.add_argument('--memory-threshold', type=float, default=0.25, help="Allowed fractional growth in peak memory")
+    args = parser.parse_args(argv)
+
+    groups = [group.strip() for group in args.only.split(',') if group.strip()]
+    unknown = [group for group in groups if group not in GROUPS]
+    if unknown:
+        parser.error(f"unknown benchmark groups: {', '.join(unknown)}")
+
+    report = {'environment': environment_info(), 'quick': args.quick,
+              'results': run_benchmarks(groups, quick=args.quick, name_filter=args.filter)}
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to record one")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(report['results'], baseline['results'], args.threshold, args.memory_threshold)
+    if regressions:
+        print(f"{len(regressions)} regression(s) against {args.baseline}:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    print(f"No regressions against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+# benchmarks/startup.py
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+# module: (cold import budget in ms, heavy modules it must not load)
+BUDGETS = {
+    'simulation': (250, ('pygame', 'matplotlib', 'torch', 'gym')),
+    'flying_bird_vec_env': (250, ('pygame', 'matplotlib', 'torch', 'gym')),
+    'subproc_vec_env': (300, ('pygame', 'matplotlib', 'torch', 'gym')),
+    'game': (250, ('pygame', 'matplotlib', 'torch', 'gym')),
+    'flying_bird_env': (500, ('pygame', 'matplotlib', 'torch')),
+    'train_dqn': (4000, ('pygame', 'matplotlib')),
+    'evaluate': (250, ('pygame', 'matplotlib', 'torch', 'gym')),
+}
+HEAVY_MODULES = ('pygame', 'matplotlib', 'torch', 'gym')
+
+# Runs in a fresh interpreter: time one import and report which heavy modules it pulled in
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{'ms': elapsed * 1000, 'loaded': [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure(module: str, repeats: int = 5):
+    """Import module in repeats fresh interpreters; return the median time in ms and the heavy modules loaded"""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    times = []
+    loaded = set()
+    for _ in range(repeats):
+        output = subprocess.run([sys.executable, '-c', PROBE.format(module=module, heavy=HEAVY_MODULES)],
+                                cwd=root, capture_output=True, text=True, check=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        times.append(result['ms'])
+        loaded.update(result['loaded'])
+    return float(np.median(times)), sorted(loaded)
+
+
+def check(modules, repeats: int = 5, scale: float = 1.0):
+    """Measure each module against its budget and return the failures as human-readable lines"""
+    failures = []
+    for module in modules:
+        budget_ms, forbidden = BUDGETS[module]
+        ms, loaded = measure(module, repeats)
+        unexpected = [name for name in loaded if name in forbidden]
+        status = 'ok' if ms <= budget_ms * scale and not unexpected else 'FAIL'
+        print(f"{module:<22}{ms:>9.1f} ms  budget {budget_ms * scale:>7.0f} ms  loads {', '.join(loaded) or '-':<20}{status}")
+        if ms > budget_ms * scale:
+            failures.append(f"{module}: import took {ms:.1f} ms, budget {budget_ms * scale:.0f} ms")
+        if unexpected:
+            failures.append(f"{module}: import loaded {', '.join(unexpected)}")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check cold-start import time of the headless modules")
+    parser.add_argument('--only', default=','.join(BUDGETS), help="Comma-separated modules to check")
+    parser.add_argument('--repeats', type=int, default=5, help="Fresh interpreters per module (the median is used)")
+    parser.add_argument('--scale', type=float, default=1.0, help="Multiply every time budget (for slower machines)")
+    args = parser.parse_args(argv)
+
+    modules = [module.strip() for module in args.only.split(',') if module.strip()]
+    unknown = [module for module in modules if module not in BUDGETS]
+    if unknown:
+        parser.error(f"no budget for: {', '.join(unknown)}")
+
+    failures = check(modules, args.repeats, args.scale)
+    if failures:
+        print(f"{len(failures)} startup budget failure(s):")
+        for line in failures:
+            print(f"  {line}")
+        return 1
+    print("All startup budgets met")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,38 +1,42 @@
-import pygame
 import config
 
+BIRD_WIDTH, BIRD_HEIGHT = config.BIRD_SCALE
+
 class Bird:
-    """Class to handle bird properties and behavior"""
+    """Bird physics: float position of the hitbox's top-left corner and vertical velocity"""
+
+    __slots__ = ('x', 'y', 'velocity')
 
-    def __init__(self, x: int, y: int):
+    def __init__(self, x: float = config.BIRD_START_X, y: float = config.BIRD_START_Y):
         """Initialize bird object with position and velocity"""
-        self.image = pygame.image.load(config.BIRD_IMAGE_PATH).convert_alpha()
-        self.image = pygame.transform.scale(self.image, config.BIRD_SCALE)  # Rescale bird image
-        self.rect = self.image.get_rect(center=(x, y))
-        self.velocity = 0
-        self.flap_sound = pygame.mixer.Sound(config.FLAP_SOUND_PATH)
+        self.reset(x, y)
+
+    def reset(self, x: float = config.BIRD_START_X, y: float = config.BIRD_START_Y):
+        """Place the bird at (x, y) at rest"""
+        self.x = float(x)
+        self.y = float(y)
+        self.velocity = 0.0
 
     def flap(self):
         """Simulate bird flapping its wings by applying upward velocity"""
         self.velocity = config.FLAP_STRENGTH
-        self.flap_sound.play()
 
     def apply_gravity(self):
         """Apply gravity to the bird's movement"""
         self.velocity += config.GRAVITY
-        self.rect.centery += self.velocity
+        self.y += self.velocity
 
     def update(self):
         """Update bird state on every frame"""
         self.apply_gravity()
 
         # Prevent bird from going off-screen vertically
-        if self.rect.top < 0:
-            self.rect.top = 0
-        if self.rect.bottom >= config.SCREEN_HEIGHT:
-            self.rect.bottom = config.SCREEN_HEIGHT
-
-    def draw(self, screen):
-        """Render the bird on the screen if rendering is enabled"""
-        if screen is not None:
-            screen.blit(self.image, self.rect)
\ No newline at end of file
+        if self.y < 0:
+            self.y = 0.0
+        if self.y + BIRD_HEIGHT >= config.SCREEN_HEIGHT:
+            self.y = float(config.SCREEN_HEIGHT - BIRD_HEIGHT)
+
+    @property
+    def centery(self):
+        """Vertical center of the hitbox"""
+        return self.y + BIRD_HEIGHT / 2
@@ -0,0 +1,132 @@
+# checkpoint.py
+import glob
+import os
+import queue
+import random
+import threading
+import numpy as np
+import torch
+
+CHECKPOINT_PATTERN = 'checkpoint_*.pt'
+
+
+def snapshot(obj):
+    """Return a copy of obj that later training steps cannot modify.
+
+    Tensors are copied to the CPU and NumPy arrays are copied; dicts, lists and
+    tuples are copied recursively. Other values (numbers, strings, RNG state
+    tuples) are immutable and kept as they are.
+    """
+    if isinstance(obj, torch.Tensor):
+        return obj.detach().to('cpu', copy=True)
+    if isinstance(obj, np.ndarray):
+        return obj.copy()
+    if isinstance(obj, dict):
+        return {key: snapshot(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return type(obj)(snapshot(value) for value in obj)
+    return obj
+
+
+class AsyncCheckpointer:
+    """Writes checkpoints from a background thread.
+
+    save() takes a snapshot of the state on the calling thread (a memory copy)
+    and returns; serialization and disk I/O happen on the writer thread. Files
+    are written to a temporary name and renamed, so a crash never leaves a
+    truncated checkpoint behind, and only the newest `keep` are kept. If the
+    previous checkpoint is still being written, save() waits for it first.
+    A failed write does not stop the thread; its exception is raised by the
+    next save(), wait() or close().
+    """
+
+    def __init__(self, directory: str, keep: int = 3):
+        """Create the checkpoint directory and start the writer thread"""
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.keep = keep
+        self._queue = queue.Queue(maxsize=1)
+        self._error = None  # Exception of the last failed write, raised in the caller's thread
+        self._thread = threading.Thread(target=self._write_loop, name='checkpoint-writer', daemon=True)
+        self._thread.start()
+
+    def _write_loop(self):
+        """Background thread: write queued snapshots until the None sentinel arrives"""
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    break
+                path, state = item
+                tmp_path = path + '.tmp'
+                torch.save(state, tmp_path)
+                os.replace(tmp_path, path)
+                self._prune()
+            except Exception as error:  # e.g. disk full; keep serving the queue so callers never block
+                self._error = error
+            finally:
+                self._queue.task_done()
+
+    def _prune(self):
+        """Delete all but the newest `keep` checkpoints"""
+        for path in sorted(glob.glob(os.path.join(self.directory, CHECKPOINT_PATTERN)))[:-self.keep]:
+            os.remove(path)
+
+    def _raise_error(self):
+        """Re-raise the exception of a failed write, once"""
+        error, self._error = self._error, None
+        if error is not None:
+            raise RuntimeError(f"writing a checkpoint to {self.directory} failed") from error
+
+    def save(self, state: dict, step: int):
+        """Snapshot state and queue it to be written as checkpoint_<step>.pt"""
+        self._raise_error()
+        path = os.path.join(self.directory, f'checkpoint_{step:010d}.pt')
+        self._queue.put((path, snapshot(state)))
+
+    def wait(self):
+        """Block until every queued checkpoint is on disk"""
+        self._queue.join()
+        self._raise_error()
+
+    def close(self):
+        """Finish pending writes and stop the writer thread"""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        self._raise_error()
+
+
+def rng_state(generator=None):
+    """Capture the Python, NumPy, torch (and CUDA) global RNG states, plus an optional np.random.Generator"""
+    state = {
+        'python': random.getstate(),
+        'numpy': np.random.get_state(),
+        'torch': torch.get_rng_state(),
+        'cuda': torch.cuda.get_rng_state_all() if torch.cuda.is_available() else None,
+    }
+    if generator is not None:
+        state['generator'] = generator.bit_generator.state
+    return state
+
+
+def set_rng_state(state, generator=None):
+    """Restore RNG states captured by rng_state()"""
+    random.setstate(state['python'])
+    np.random.set_state(state['numpy'])
+    torch.set_rng_state(state['torch'])
+    if state['cuda'] is not None and torch.cuda.is_available():
+        torch.cuda.set_rng_state_all(state['cuda'])
+    if generator is not None and 'generator' in state:
+        generator.bit_generator.state = state['generator']
+
+
+def latest_checkpoint(directory: str):
+    """Return the path of the newest checkpoint in directory, or None"""
+    paths = sorted(glob.glob(os.path.join(directory, CHECKPOINT_PATTERN)))
+    return paths[-1] if paths else None
+
+
+def load_checkpoint(path: str):
+    """Load a checkpoint written by AsyncCheckpointer (it holds NumPy arrays and RNG states, not just weights)"""
+    return torch.load(path, map_location='cpu', weights_only=False)
@@ -20,6 +20,11 @@ PIPE_HEIGHT = 400
 PIPE_GAP = 220 
 PIPE_VELOCITY = 2.7
 PIPE_SCALE = (PIPE_WIDTH, PIPE_HEIGHT)  # Rescale pipes to fit screen
+PIPE_POOL_SIZE = 4  # Pipe objects kept for reuse per game (grows if more are ever on screen)
+PIPE_SPAWN_X = SCREEN_WIDTH + 100  # Pipes enter from off screen at this x-coordinate
+PIPE_SPAWN_INTERVAL = 100  # Frames between pipe spawns at speed factor 1
+PIPE_GAP_Y_MIN = 100  # Range of the top edge of the gap between a pipe pair
+PIPE_GAP_Y_MAX = SCREEN_HEIGHT - PIPE_GAP - 100
 
 # Background settings
 BACKGROUND_VELOCITY = 1.8
@@ -39,4 +44,8 @@ FLAP_SOUND_PATH = 'assets/sounds/flap.wav'
 HIT_SOUND_PATH = 'assets/sounds/hit.wav'
 
 
-FPS_TRAINING = 10  # Control the speed during training (for time.sleep)
\ No newline at end of file
+FPS_TRAINING = 10  # Steps per second for the 'fixed' pacing mode during training
+
+# Pixel observations
+PIXEL_OBS_SIZE = (64, 96)  # (width, height) frames are drawn at, a uniform 0.16 scale of the screen
+FRAME_STACK = 4  # Most recent frames stacked into one observation
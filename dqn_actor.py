@@ -0,0 +1,65 @@
+# dqn_actor.py
+import numpy as np
+import torch
+
+
+class DQNActor:
+    """Epsilon-greedy action selection for a batch of observations.
+
+    Observations from one or many envs are copied into a preallocated input
+    tensor and evaluated with a single forward pass under torch.inference_mode,
+    so no autograd graph is recorded. Exploration is decided for the whole
+    batch at once, and the forward pass is skipped when every env explores.
+    """
+
+    def __init__(self, model, num_actions: int, device, batch_size: int = 1, seed=None):
+        """Initialize the actor for a model taking inputs of size model.fc1.in_features"""
+        self.model = model
+        self.num_actions = num_actions
+        self.device = torch.device(device)
+        self.input_dim = model.fc1.in_features
+        self.rng = np.random.default_rng(seed)
+        self._allocate(batch_size)
+
+    def _allocate(self, batch_size: int):
+        """Allocate the staging and device input tensors for up to batch_size observations"""
+        self.batch_size = batch_size
+        pin = self.device.type == 'cuda'
+        self.host_input = torch.empty((batch_size, self.input_dim), dtype=torch.float32, pin_memory=pin)
+        self.host_view = self.host_input.numpy()
+        if self.device.type == 'cpu':
+            self.device_input = self.host_input
+        else:
+            self.device_input = torch.empty((batch_size, self.input_dim), dtype=torch.float32, device=self.device)
+
+    def greedy(self, states):
+        """Return the greedy actions for a (batch, input_dim) array of observations"""
+        n = len(states)
+        if n > self.batch_size:
+            self._allocate(n)
+        self.host_view[:n] = states
+        with torch.inference_mode():
+            inputs = self.device_input[:n]
+            if self.device_input is not self.host_input:
+                inputs.copy_(self.host_input[:n], non_blocking=True)
+            return self.model(inputs).argmax(1).cpu().numpy()
+
+    def act(self, states, epsilon):
+        """Select epsilon-greedy actions for one observation or a batch of them.
+
+        epsilon may be a scalar or one value per observation. Returns an int64
+        array with one action per observation.
+        """
+        states = np.asarray(states, dtype=np.float32)
+        if states.ndim == 1:
+            states = states[None, :]
+        n = len(states)
+
+        # One uniform draw decides exploration and, given u < epsilon, u / epsilon is
+        # again uniform on [0, 1) and picks the random action
+        u = self.rng.random(n)
+        explore = u < epsilon
+        actions = (u / np.maximum(epsilon, 1e-12) * self.num_actions).astype(np.int64)
+        if explore.all():
+            return actions
+        return np.where(explore, actions, self.greedy(states))
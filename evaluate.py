@@ -0,0 +1,161 @@
+# evaluate.py
+import argparse
+import json
+import multiprocessing as mp
+import time
+import numpy as np
+
+NUM_SEEDS = 200  # Greedy episodes per evaluation, one per seed
+MAX_STEPS = 5000  # Agent decisions (env.step calls, frame_skip frames each) after which an episode is cut off
+PERCENTILES = (5, 25, 50, 75, 95)
+OUTCOMES = ('pipe', 'ground', 'ceiling', 'max_steps')
+
+# Per-process state set up by _init_worker
+_actor = None
+_frame_skip = 1
+
+
+def load_model(path: str):
+    """Load a DQN from a saved state dict (dqn_model.pth) or a training checkpoint"""
+    import torch
+    from dqn_network import DQN
+    from flying_bird_vec_env import OBS_DIM
+
+    state = torch.load(path, map_location='cpu', weights_only=False)
+    if 'model' in state:  # A checkpoint written during training
+        state = state['model']
+    model = DQN(OBS_DIM, 2)
+    model.load_state_dict(state)
+    model.eval()
+    return model
+
+
+def _init_worker(model_path: str, frame_skip: int):
+    """Load the model once per worker process; workers use one thread each so they don't oversubscribe"""
+    global _actor, _frame_skip
+    import torch
+    from dqn_actor import DQNActor
+    torch.set_num_threads(1)
+    _actor = DQNActor(load_model(model_path), 2, 'cpu')
+    _frame_skip = frame_skip
+
+
+def run_episodes(seeds, max_steps: int = MAX_STEPS):
+    """Play one greedy episode per seed, all in lockstep with one forward pass per step.
+
+    Returns a list of (seed, score, steps, outcome) where steps counts agent
+    decisions (each one frame_skip frames) and outcome is what the bird hit or
+    'max_steps' if the episode was cut off.
+    """
+    from flying_bird_env import FlyingBirdEnv
+
+    envs = [FlyingBirdEnv(render=False, seed=int(seed), frame_skip=_frame_skip) for seed in seeds]
+    states = np.stack([env.reset() for env in envs])
+    active = list(range(len(envs)))  # Indices of the envs still playing
+    steps = 0
+    results = [None] * len(envs)
+    while active:
+        actions = _actor.greedy(states[active])
+        steps += 1
+        still_active = []
+        for i, action in zip(active, actions.tolist()):
+            env = envs[i]
+            states[i], _, done, _ = env.step(action)
+            if done:
+                results[i] = (int(seeds[i]), env.score, steps, env.sim.crash_cause())
+            elif steps >= max_steps:
+                results[i] = (int(seeds[i]), env.score, steps, 'max_steps')
+            else:
+                still_active.append(i)
+        active = still_active
+    return results
+
+
+def summarize(values):
+    """Mean, spread and percentiles of a sequence of numbers"""
+    values = np.asarray(values, dtype=np.float64)
+    summary = {'mean': float(values.mean()), 'std': float(values.std()),
+               'min': float(values.min()), 'max': float(values.max())}
+    for q, value in zip(PERCENTILES, np.percentile(values, PERCENTILES)):
+        summary[f'p{q}'] = float(value)
+    return summary
+
+
+def evaluate(model_path: str = 'dqn_model.pth', num_seeds: int = NUM_SEEDS, first_seed: int = 0,
+             max_steps: int = MAX_STEPS, num_workers=None, frame_skip: int = 1, per_seed: bool = False):
+    """Evaluate the greedy policy of a saved model on seeds first_seed .. first_seed + num_seeds - 1.
+
+    The seeds are split into chunks that a pool of num_workers processes
+    (default: one per CPU) plays in lockstep, batching the forward passes of
+    each chunk. max_steps and the reported episode lengths count agent
+    decisions, so with frame_skip an episode lasts up to max_steps * frame_skip
+    frames. Returns the score and episode length distributions and how the
+    episodes ended, as a JSON-serializable dict.
+    """
+    if num_workers is None:
+        num_workers = mp.cpu_count()
+    num_workers = max(1, min(num_workers, num_seeds))
+    seeds = np.arange(first_seed, first_seed + num_seeds)
+    # A few chunks per worker, so one long-lived chunk does not hold up the others
+    chunks = np.array_split(seeds, min(num_seeds, 4 * num_workers))
+
+    start = time.perf_counter()
+    if num_workers == 1:
+        import torch
+        threads = torch.get_num_threads()
+        _init_worker(model_path, frame_skip)
+        try:
+            results = [run_episodes(chunk, max_steps) for chunk in chunks]
+        finally:
+            torch.set_num_threads(threads)  # _init_worker limited this process to one thread
+    else:
+        with mp.get_context().Pool(num_workers, initializer=_init_worker,
+                                   initargs=(model_path, frame_skip)) as pool:
+            results = pool.starmap(run_episodes, [(chunk, max_steps) for chunk in chunks])
+    elapsed = time.perf_counter() - start
+    episodes = sorted(episode for chunk in results for episode in chunk)
+
+    scores = [score for _, score, _, _ in episodes]
+    lengths = [steps for _, _, steps, _ in episodes]
+    report = {
+        'model': model_path,
+        'episodes': len(episodes),
+        'first_seed': first_seed,
+        'max_steps': max_steps,
+        'frame_skip': frame_skip,
+        'workers': num_workers,
+        'score': summarize(scores),
+        'steps': summarize(lengths),
+        'outcomes': {outcome: sum(1 for *_, o in episodes if o == outcome) for outcome in OUTCOMES},
+        'elapsed_seconds': elapsed,
+        'env_steps_per_second': sum(lengths) / elapsed,
+    }
+    if per_seed:
+        report['per_seed'] = [{'seed': seed, 'score': score, 'steps': steps, 'outcome': outcome}
+                              for seed, score, steps, outcome in episodes]
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Evaluate a saved DQN with greedy episodes over many seeds")
+    parser.add_argument('--model', default='dqn_model.pth', help="State dict or training checkpoint to evaluate")
+    parser.add_argument('--seeds', type=int, default=NUM_SEEDS, help="Number of seeds (one episode each)")
+    parser.add_argument('--first-seed', type=int, default=0, help="First seed of the range")
+    parser.add_argument('--max-steps', type=int, default=MAX_STEPS, help="Cut episodes off after this many agent decisions (frame_skip frames each)")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: one per CPU)")
+    parser.add_argument('--frame-skip', type=int, default=1, help="Frame skip the model was trained with")
+    parser.add_argument('--per-seed', action='store_true', help="Include every episode in the report")
+    parser.add_argument('--output', default=None, help="Write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    report = evaluate(args.model, args.seeds, args.first_seed, args.max_steps, args.workers, args.frame_skip,
+                      args.per_seed)
+    if args.output is None:
+        print(json.dumps(report, indent=2))
+    else:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        score = report['score']
+        print(f"{report['episodes']} episodes in {report['elapsed_seconds']:.1f} s: "
+              f"score mean {score['mean']:.2f}, median {score['p50']:.0f}, p95 {score['p95']:.0f}; "
+              f"outcomes {report['outcomes']}")
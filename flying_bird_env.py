@@ -1,284 +1,158 @@
 import gym, time
 from gym import spaces
 import numpy as np
-import pygame
-import random
 import config
+from simulation import Simulation
+from flying_bird_vec_env import make_observation_space
 
 class FlyingBirdEnv(gym.Env):
-    """Custom Environment that implements the Flying Bird game logic without the Game class"""
-    def __init__(self, render=False):
+    """Gym environment driving the headless Flying Bird simulation; pygame is only loaded to render.
+
+    obs_mode selects the observation: 'state' is the 5-float vector below,
+    'grayscale' and 'rgb' are the last frame_stack frames drawn offscreen at
+    pixel_size (uint8, shape (k, height, width) or (k, height, width, 3)).
+    With frame_skip=k each step() repeats the action for k frames (stopping
+    early on a crash), sums their rewards and builds a single observation.
+    scroll_background=False keeps the rendered background still, so each
+    frame only redraws and updates the areas around the bird, pipes and score.
+    """
+    def __init__(self, render=False, profiler=None, seed=None, render_fps=None, obs_mode='state',
+                 frame_stack=config.FRAME_STACK, pixel_size=config.PIXEL_OBS_SIZE, frame_skip=1,
+                 scroll_background=True):
         super(FlyingBirdEnv, self).__init__()
+        if frame_skip < 1:
+            raise ValueError(f"frame_skip must be at least 1, not {frame_skip}")
+        self.frame_skip = frame_skip
         
         # Action space: 0 - No action, 1 - Flap
         self.action_space = spaces.Discrete(2)
 
-        # Observation space: bird's y position, velocity, nearest pipe's x and y position
-        self.observation_space = spaces.Box(
-            low=np.array([0, -10, 0, 0], dtype=np.float32),  # y pos, velocity, pipe x, pipe y
-            high=np.array([config.SCREEN_HEIGHT, 10, config.SCREEN_WIDTH, config.SCREEN_HEIGHT], dtype=np.float32)
-        )
+        # Observation space: bird's y position, velocity, horizontal distance to the nearest pipe,
+        # distance to the ground and distance to the ceiling (the same bounds as the vectorized envs)
+        self.observation_space = make_observation_space()
+
+        # Pixel observations are drawn offscreen, without a window, display or audio
+        if obs_mode not in ('state', 'grayscale', 'rgb'):
+            raise ValueError(f"obs_mode must be 'state', 'grayscale' or 'rgb', not {obs_mode!r}")
+        self.obs_mode = obs_mode
+        self.pixels = None
+        if obs_mode != 'state':
+            from pixel_observation import PixelObserver  # Imports pygame
+            self.pixels = PixelObserver(pixel_size, grayscale=obs_mode == 'grayscale', frame_stack=frame_stack)
+            self.observation_space = spaces.Box(low=0, high=255, shape=self.pixels.shape, dtype=np.uint8)
+        self.frame_renderer = None  # Full-size OffscreenRenderer for render(mode='rgb_array'), created on first use
 
         self.render_enabled = render
-        self.screen = None
-        self.clock = None
-        self.font = None
-
-        self.bird = None
-        self.pipes = []
-        self.background = None
-
-        self.pipe_timer = 0
-        self.speed_factor = 1.0
-        self.score = 0
-        self.done = False
+        self.profiler = profiler  # Optional PhaseProfiler timing the phases of step()
+        self.sim = Simulation(seed=seed, profiler=profiler)
+        self.np_random = self.sim.np_random  # Per-env RNG for pipe heights, captured by get_state()
         self.state = None
         self.info = {}
 
+        # With render_fps, render() draws at most that many frames per second and never waits,
+        # so the simulation is not slowed down to the display rate
+        self.render_fps = render_fps
+        self.renderer = None
         if self.render_enabled:
-            pygame.init()
-            self.screen = pygame.display.set_mode((config.SCREEN_WIDTH, config.SCREEN_HEIGHT))
-            pygame.display.set_caption('Flying Bird Game')
-            self.clock = pygame.time.Clock()
-            self.font = pygame.font.Font(None, 36)
-        
-        self.reset()
+            from renderer import Renderer  # Headless envs never import pygame
+            self.renderer = Renderer(max_fps=render_fps, scroll_background=scroll_background)
+
+        # The simulation starts out reset; resetting again here would consume a pipe height
+        self.state = self.first_observation()
+
+    @property
+    def score(self):
+        """Number of pipes passed in the current episode"""
+        return self.sim.score
+
+    @property
+    def done(self):
+        """Whether the current episode is over"""
+        return self.sim.done
     
     def reset(self):
         """Resets the environment to the initial state."""
-        # Initialize bird, pipes, and background components
-        self.bird = Bird(config.BIRD_START_X, config.BIRD_START_Y, render=self.render_enabled)
-        self.pipes = [Pipe(config.SCREEN_WIDTH + 100, render=self.render_enabled)]
-        self.background = Background(render=self.render_enabled)
-        self.pipe_timer = 0
-        self.speed_factor = 1.0
-        self.score = 0
-        self.done = False
+        self.sim.reset()
         
-        # Get the initial state: bird's position, velocity, nearest pipe's position
-        bird_y = self.bird.rect.centery
-        bird_vel = self.bird.velocity
-        pipe_x = self.pipes[0].rect_top.x
-        pipe_y = self.pipes[0].rect_top.height
-
-        self.state = np.array([bird_y, bird_vel, pipe_x, pipe_y], dtype=np.float32)
+        # Get the initial state, built the same way as in step()
+        self.state = self.first_observation()
         self.info = {}
         return self.state
     
     def step(self, action):
         """Executes one time step within the environment."""
-        
-        # 1. Perform action: If action == 1, bird flaps
-        if action == 1:
-            self.bird.flap()
-
-        # 2. Update game state
-        self.bird.update()
-        self.background.move()
-
-        # Move the pipes
-        for pipe in self.pipes:
-            pipe.move()
-
-        # Check if we need to spawn new pipes
-        self.pipe_timer += 1
-        if self.pipe_timer > 100 / self.speed_factor:
-            self.spawn_pipe()
-            self.pipe_timer = 0
-
-        # Update score if the bird passes a pipe
-        pipe_passed = self.update_score()
-
-        # Remove pipes that have gone off screen
-        self.pipes = [pipe for pipe in self.pipes if not pipe.is_off_screen()]
-
-        # 3. Check for collisions
-        done = self.check_collision()
-
-        # 4. Calculate reward
-        if done:
-            reward = -100  # Negative reward for game over
-        elif pipe_passed:
-            reward = 1  # Reward for passing a pipe
+        # 1. Perform action (1 flaps) and advance the simulation by frame_skip frames, summing the rewards
+        flap = action == 1
+        if flap and self.renderer is not None:
+            self.renderer.play_flap()
+        sim = self.sim
+        reward = 0
+        for _ in range(self.frame_skip):
+            passed, done = sim.step(flap)
+
+            # 2. Calculate reward
+            if done:
+                reward -= 100  # Negative reward for game over
+                break
+            if passed:
+                reward += 1  # Reward for passing a pipe
+            # No reward for just staying in play
+
+        prof = self.profiler
+        if prof is not None:
+            t = prof.now()
+
+        if self.pixels is None:
+            self.state = self.sim.observation()
+            if prof is not None:
+                prof.lap('env/observation', t)
         else:
-            reward = 0  # No reward for just staying in play
-
-
-        if done:
-            self.done = True
-
-        # Bird's y position and velocity
-        bird_y = self.bird.rect.centery
-        bird_vel = self.bird.velocity
-
-        # Get nearest pipe positions (top and bottom) and distance to it
-        if len(self.pipes) > 0:
-            pipe = self.pipes[0]
-            pipe_x = pipe.rect_top.x
-        else:
-            pipe_x = config.SCREEN_WIDTH
-
-        # Distance from bird to ground and ceiling
-        dist_to_ground = config.SCREEN_HEIGHT - bird_y
-        dist_to_ceiling = bird_y
-
-        # Update state
-        self.state = np.array([
-            bird_y,                # Bird's vertical position
-            bird_vel,              # Bird's velocity
-            pipe_x - self.bird.rect.x,  # Horizontal distance to the nearest pipe
-            dist_to_ground,        # Distance to the ground
-            dist_to_ceiling,       # Distance to the ceiling
-        ], dtype=np.float32)
-
-        return self.state, reward, self.done, self.info
-    
-    def spawn_pipe(self):
-        """Spawn new pipes at regular intervals."""
-        self.pipes.append(Pipe(config.SCREEN_WIDTH + 100, render=self.render_enabled))
-        
-    def update_score(self):
-        """Update the score when the bird passes a pipe and return whether a pipe was passed"""
-        for pipe in self.pipes:
-            if pipe.rect_top.right < self.bird.rect.left and not pipe.passed:
-                self.score += 1
-                pipe.passed = True
-                return True  # Return True when a pipe is passed
-        return False  # Return False if no pipe was passed
-
-    def check_collision(self):
-        """Check for collisions between the bird and pipes or screen edges."""
-        for pipe in self.pipes:
-            if self.bird.rect.colliderect(pipe.rect_top) or self.bird.rect.colliderect(pipe.rect_bottom):
-                return True
-        return self.bird.rect.bottom >= config.SCREEN_HEIGHT or self.bird.rect.top <= 0
+            # The stack is a view into the ring buffer, so the caller gets a copy it can keep
+            self.state = self.pixels.observe(self.sim).copy()
+            if prof is not None:
+                prof.lap('env/pixels', t)
+        return self.state, reward, done, self.info
+
+    def first_observation(self):
+        """Build the observation at the start of an episode (or after set_state), refilling the frame stack."""
+        if self.pixels is None:
+            return self.sim.observation()
+        return self.pixels.reset(self.sim).copy()
+
+    def get_state(self):
+        """Return a snapshot of the game (bird, pipes, timers, score and RNG) as a flat float64 array.
+
+        See Simulation.get_state(); set_state() of the snapshot, on this or any
+        other env, reproduces the episode exactly from that point.
+        """
+        return self.sim.get_state()
+
+    def set_state(self, snapshot):
+        """Restore a snapshot taken by get_state() and return the observation at that point."""
+        self.sim.set_state(snapshot)
+        self.state = self.first_observation()  # Earlier frames are not in the snapshot
+        return self.state
     
     def render(self, mode='human'):
-        """Render the current state of the game."""
-        if not self.render_enabled or self.done:
+        """Render the current state of the game; mode 'rgb_array' returns the frame as a (height, width, 3) array."""
+        if mode == 'rgb_array':
+            if self.frame_renderer is None:
+                from pixel_observation import OffscreenRenderer
+                self.frame_renderer = OffscreenRenderer(draw_score=True)
+            return self.frame_renderer.draw(self.sim).copy()
+
+        if self.renderer is None or self.done:
             return
 
-        self.screen.fill(config.COLOR_BLACK)  # Clear screen
-        self.background.draw(self.screen)
-        self.bird.draw(self.screen)
-        for pipe in self.pipes:
-            pipe.draw(self.screen)
-        self.display_score()
-
-        pygame.display.update()
-        self.clock.tick(config.FPS)
-    
-    def display_score(self):
-        """Display the score on the screen."""
-        score_surface = self.font.render(f"Score: {self.score}", True, (0, 0, 255))
-        self.screen.blit(score_surface, (10, 10))
+        self.renderer.draw(self.sim)
+        if self.render_fps is None:
+            self.renderer.tick(config.FPS)
 
     def close(self):
         """Clean up when closing the environment."""
-        if self.render_enabled:
-            pygame.quit()
-
-
-class Bird:
-    """Class to handle bird properties and behavior"""
-
-    def __init__(self, x: int, y: int, render: bool = True):
-        """Initialize bird object with position and velocity"""
-        self.render_enabled = render
-        if self.render_enabled:
-            self.image = pygame.image.load(config.BIRD_IMAGE_PATH).convert_alpha()
-            self.image = pygame.transform.scale(self.image, config.BIRD_SCALE)
-            pygame.mixer.init()  # Initialize the mixer when render is enabled
-            self.flap_sound = pygame.mixer.Sound(config.FLAP_SOUND_PATH)
-        else:
-            self.flap_sound = None  # No sound when render is disabled
-        
-        self.rect = pygame.Rect(x, y, *config.BIRD_SCALE)
-        self.velocity = 0
-
-    def flap(self):
-        """Simulate bird flapping its wings by applying upward velocity."""
-        self.velocity = config.FLAP_STRENGTH
-        if self.render_enabled:
-            self.flap_sound.play()
-
-    def apply_gravity(self):
-        """Apply gravity to the bird's movement."""
-        self.velocity += config.GRAVITY
-        self.rect.centery += self.velocity
-
-    def update(self):
-        """Update bird state on every frame."""
-        self.apply_gravity()
-        if self.rect.top < 0:
-            self.rect.top = 0
-        if self.rect.bottom >= config.SCREEN_HEIGHT:
-            self.rect.bottom = config.SCREEN_HEIGHT
-
-    def draw(self, screen):
-        """Render the bird on the screen."""
-        if self.render_enabled:
-            screen.blit(self.image, self.rect)
-
-
-class Pipe:
-    """Class to handle pipe properties and movement."""
-
-    def __init__(self, x: int, render: bool = True):
-        """Initialize pipe pair (top and bottom) at x-coordinate."""
-        self.render_enabled = render
-        if self.render_enabled:
-            self.image = pygame.image.load(config.PIPE_IMAGE_PATH).convert_alpha()
-            self.image = pygame.transform.scale(self.image, config.PIPE_SCALE)
-        self.rect_top = pygame.Rect(x, random.randint(100, config.SCREEN_HEIGHT - config.PIPE_GAP - 100), *config.PIPE_SCALE)
-        self.rect_bottom = pygame.Rect(x, self.rect_top.bottom + config.PIPE_GAP, config.PIPE_WIDTH, config.SCREEN_HEIGHT)
-
-        self.passed = False
-
-    def move(self):
-        """Move the pipe to the left."""
-        self.rect_top.x -= config.PIPE_VELOCITY
-        self.rect_bottom.x -= config.PIPE_VELOCITY
-
-    def draw(self, screen):
-        """Render the pipes."""
-        if self.render_enabled:
-            screen.blit(self.image, self.rect_top)
-            screen.blit(self.image, self.rect_bottom)
-
-    def is_off_screen(self):
-        """Check if the pipe has moved off the screen."""
-        return self.rect_top.right < 0
-
-class Background:
-    """Class to handle background scrolling."""
-
-    def __init__(self, render: bool = True):
-        """Initialize background images."""
-        self.render_enabled = render
-        if self.render_enabled:
-            self.image = pygame.image.load(config.BACKGROUND_IMAGE_PATH).convert_alpha()
-            self.image = pygame.transform.scale(self.image, config.BACKGROUND_SCALE)
-            self.rect1 = self.image.get_rect(topleft=(0, 0))
-            self.rect2 = self.image.get_rect(topleft=(config.SCREEN_WIDTH, 0))
-        else:
-            self.rect1 = pygame.Rect(0, 0, config.SCREEN_WIDTH, config.SCREEN_HEIGHT)
-            self.rect2 = pygame.Rect(config.SCREEN_WIDTH, 0, config.SCREEN_WIDTH, config.SCREEN_HEIGHT)
-
-    def move(self):
-        """Scroll the background to the left."""
-        self.rect1.x -= config.BACKGROUND_VELOCITY
-        self.rect2.x -= config.BACKGROUND_VELOCITY
-        if self.rect1.right <= 0:
-            self.rect1.left = config.SCREEN_WIDTH
-        if self.rect2.right <= 0:
-            self.rect2.left = config.SCREEN_WIDTH
-
-    def draw(self, screen):
-        """Render the background."""
-        if self.render_enabled:
-            screen.blit(self.image, self.rect1)
-            screen.blit(self.image, self.rect2)
+        if self.renderer is not None:
+            self.renderer.close()
+            self.renderer = None
 
 if __name__ == "__main__":
     env = FlyingBirdEnv(render=False)
@@ -0,0 +1,268 @@
+# flying_bird_vec_env.py
+import functools
+import numpy as np
+import config
+
+# Bird hitbox, as in bird.Bird
+BIRD_WIDTH, BIRD_HEIGHT = config.BIRD_SCALE
+BIRD_HALF_HEIGHT = BIRD_HEIGHT / 2
+
+# Pipes spawn off screen and scroll left; one spawns every PIPE_SPAWN_INTERVAL + 1 steps
+PIPE_SPAWN_X = config.PIPE_SPAWN_X
+PIPE_SPAWN_INTERVAL = config.PIPE_SPAWN_INTERVAL
+PIPE_GAP_Y_LOW = config.PIPE_GAP_Y_MIN
+PIPE_GAP_Y_HIGH = config.PIPE_GAP_Y_MAX
+
+# Upper bound on pipes alive at once in a single env (the pool size per env)
+MAX_PIPES = int((PIPE_SPAWN_X + config.PIPE_WIDTH) / (config.PIPE_VELOCITY * (PIPE_SPAWN_INTERVAL + 1))) + 2
+
+OBS_DIM = 5
+
+
+def make_observation_space():
+    """Observation space of a single env, shared by the vectorized envs"""
+    from gym import spaces  # gym is slow to import and not needed to step the envs
+    return spaces.Box(
+        low=np.array([0, -10, -config.SCREEN_WIDTH, 0, 0], dtype=np.float32),
+        high=np.array([config.SCREEN_HEIGHT, 20, config.SCREEN_WIDTH + 100, config.SCREEN_HEIGHT, config.SCREEN_HEIGHT], dtype=np.float32)
+    )
+
+
+class FlyingBirdVecEnv:
+    """Steps N independent Flying Bird games in lockstep using struct-of-arrays NumPy buffers.
+
+    The physics mirror simulation.Simulation exactly (float positions, same operation order),
+    but every env is advanced with batched array operations instead of per-object Python code.
+    Finished envs are reset automatically; their last observation is returned in
+    infos["final_observation"]. With frame_skip=k every step() plays k frames
+    with the same actions, as FlyingBirdEnv does.
+    """
+
+    def __init__(self, num_envs: int, seed=None, frame_skip: int = 1):
+        """Allocate the per-env state buffers and reset every env"""
+        if frame_skip < 1:
+            raise ValueError(f"frame_skip must be at least 1, not {frame_skip}")
+        self.num_envs = num_envs
+        self.frame_skip = frame_skip
+        self.np_random = np.random.default_rng(seed)
+
+        # Bird state (top edge of the hitbox, as in bird.Bird.y)
+        self.bird_y = np.zeros(num_envs, dtype=np.float64)
+        self.bird_velocity = np.zeros(num_envs, dtype=np.float64)
+
+        # Pipe state: a ring of MAX_PIPES slots per env, ordered by x with the oldest pipe at
+        # pipe_head, and a cursor counting the pipes (from the head) the bird has already passed
+        self.pipe_x = np.zeros((num_envs, MAX_PIPES), dtype=np.float64)
+        self.pipe_gap_y = np.zeros((num_envs, MAX_PIPES), dtype=np.float64)
+        self.pipe_head = np.zeros(num_envs, dtype=np.int64)
+        self.pipe_count = np.zeros(num_envs, dtype=np.int64)
+        self.pipe_passed_count = np.zeros(num_envs, dtype=np.int64)
+
+        self.pipe_timer = np.zeros(num_envs, dtype=np.int64)
+        self.score = np.zeros(num_envs, dtype=np.int64)
+
+        self._env_idx = np.arange(num_envs)
+        self._slot_idx = np.arange(MAX_PIPES)
+        self.obs = np.zeros((num_envs, OBS_DIM), dtype=np.float32)
+
+        self.reset()
+
+    @functools.cached_property
+    def action_space(self):
+        """Action space of a single env: 0 - no action, 1 - flap (built on first use, so workers never import gym)"""
+        from gym import spaces
+        return spaces.Discrete(2)
+
+    @functools.cached_property
+    def observation_space(self):
+        """Observation space of a single env (built on first use)"""
+        return make_observation_space()
+
+    def _sample_gap_y(self, count: int):
+        """Draw the top of the gap for `count` newly spawned pipes"""
+        return self.np_random.integers(PIPE_GAP_Y_LOW, PIPE_GAP_Y_HIGH, size=count, endpoint=True)
+
+    def _reset_envs(self, mask):
+        """Reset the envs selected by the boolean mask to their initial state"""
+        count = int(mask.sum())
+        if count == 0:
+            return
+        self.bird_y[mask] = config.BIRD_START_Y
+        self.bird_velocity[mask] = 0.0
+        self.pipe_head[mask] = 0
+        self.pipe_count[mask] = 1
+        self.pipe_passed_count[mask] = 0
+        self.pipe_x[mask, 0] = PIPE_SPAWN_X
+        self.pipe_gap_y[mask, 0] = self._sample_gap_y(count)
+        self.pipe_timer[mask] = 0
+        self.score[mask] = 0
+
+    def reset(self):
+        """Reset all envs and return the (N, obs_dim) initial observations"""
+        self._reset_envs(np.ones(self.num_envs, dtype=bool))
+        return self._build_obs().copy()
+
+    def _pipe_rank(self):
+        """Age rank of every slot: 0 for the oldest pipe, pipe_count and above for free slots"""
+        return (self._slot_idx[None, :] - self.pipe_head[:, None]) % MAX_PIPES
+
+    def _next_ahead(self):
+        """Slot of the nearest pipe the bird has not passed yet, and whether there is one"""
+        slot = (self.pipe_head + self.pipe_passed_count) % MAX_PIPES
+        return slot, self.pipe_passed_count < self.pipe_count
+
+    def _build_obs(self):
+        """Fill the observation buffer in place from the current state"""
+        centery = self.bird_y + BIRD_HALF_HEIGHT
+        slot, has_pipe = self._next_ahead()
+        pipe_x = np.where(has_pipe, self.pipe_x[self._env_idx, slot], config.SCREEN_WIDTH)
+
+        self.obs[:, 0] = centery
+        self.obs[:, 1] = self.bird_velocity
+        self.obs[:, 2] = pipe_x - config.BIRD_START_X
+        self.obs[:, 3] = config.SCREEN_HEIGHT - centery
+        self.obs[:, 4] = centery
+        return self.obs
+
+    def step(self, actions):
+        """Advance every env by frame_skip frames, repeating its action, and sum the rewards.
+
+        An env that crashes stops there; the others play all frame_skip frames.
+        Returns (observations, rewards, dones, infos) with leading dimension num_envs.
+        """
+        flap = np.asarray(actions) == 1
+        if self.frame_skip == 1:
+            pipe_passed, dones = self._tick(flap)
+            rewards = np.where(dones, -100.0, np.where(pipe_passed, 1.0, 0.0)).astype(np.float32)
+        else:
+            # Crashed envs are masked out of the remaining frames; the others are unaffected by it
+            rewards = np.zeros(self.num_envs, dtype=np.float32)
+            active = np.ones(self.num_envs, dtype=bool)
+            for _ in range(self.frame_skip):
+                pipe_passed, hit = self._tick(flap, active)
+                rewards += np.where(hit, -100.0, np.where(pipe_passed, 1.0, 0.0)) * active
+                active &= ~hit
+                if not active.any():
+                    break
+            dones = ~active
+
+        infos = {"score": self.score.copy()}
+        obs = self._build_obs()
+        if dones.any():
+            infos["final_observation"] = obs.copy()
+            self._reset_envs(dones)
+            obs = self._build_obs()
+
+        return obs.copy(), rewards, dones, infos
+
+    def _tick(self, flap, active=None):
+        """Advance the envs (only the active ones, given a mask) by one frame; return (pipe passed, crashed)"""
+        # 1. Flap and apply gravity
+        if active is None:
+            self.bird_velocity[flap] = config.FLAP_STRENGTH
+            self.bird_velocity += config.GRAVITY
+            self.bird_y += self.bird_velocity
+        else:
+            self.bird_velocity[flap & active] = config.FLAP_STRENGTH
+            np.add(self.bird_velocity, config.GRAVITY, out=self.bird_velocity, where=active)
+            np.add(self.bird_y, self.bird_velocity, out=self.bird_y, where=active)
+        np.clip(self.bird_y, 0, config.SCREEN_HEIGHT - BIRD_HEIGHT, out=self.bird_y)
+
+        # 2. Scroll the pipes
+        if active is None:
+            self.pipe_x -= config.PIPE_VELOCITY
+        else:
+            np.subtract(self.pipe_x, config.PIPE_VELOCITY, out=self.pipe_x, where=active[:, None])
+
+        # 3. Spawn new pipes into the next free slot of the ring
+        self.pipe_timer += 1 if active is None else active
+        spawn = self.pipe_timer > PIPE_SPAWN_INTERVAL
+        if spawn.any():
+            envs = self._env_idx[spawn]
+            slots = (self.pipe_head[envs] + self.pipe_count[envs]) % MAX_PIPES
+            self.pipe_x[envs, slots] = PIPE_SPAWN_X
+            self.pipe_gap_y[envs, slots] = self._sample_gap_y(len(envs))
+            self.pipe_count[envs] += 1
+            self.pipe_timer[envs] = 0
+
+        # Steps 4-6 change nothing for an env whose bird and pipes did not move, so they need no mask
+
+        # 4. Score by advancing the cursor past the nearest pipe once the bird has cleared it
+        # (pipes are hundreds of pixels apart, so at most one is passed per frame)
+        slot, has_pipe = self._next_ahead()
+        pipe_passed = has_pipe & (self.pipe_x[self._env_idx, slot] + config.PIPE_WIDTH < config.BIRD_START_X)
+        self.pipe_passed_count += pipe_passed
+        self.score += pipe_passed
+
+        # 5. Drop pipes that left the screen (always the oldest ones, all already passed)
+        rank = self._pipe_rank()
+        pipe_right = self.pipe_x + config.PIPE_WIDTH
+        off_screen = ((rank < self.pipe_count[:, None]) & (pipe_right < 0)).sum(axis=1)
+        self.pipe_head = (self.pipe_head + off_screen) % MAX_PIPES
+        self.pipe_count -= off_screen
+        self.pipe_passed_count = np.maximum(self.pipe_passed_count - off_screen, 0)
+
+        # 6. Collisions with the screen edges and the pipes the bird has not passed yet
+        rank = self._pipe_rank()
+        ahead = (rank >= self.pipe_passed_count[:, None]) & (rank < self.pipe_count[:, None])
+        bird_top = self.bird_y[:, None]
+        bird_bottom = bird_top + BIRD_HEIGHT
+        overlap_x = (config.BIRD_START_X < pipe_right) & (self.pipe_x < config.BIRD_START_X + BIRD_WIDTH)
+        bottom_pipe_top = self.pipe_gap_y + config.PIPE_GAP
+        hit_top = (bird_top < self.pipe_gap_y) & (self.pipe_gap_y - config.PIPE_HEIGHT < bird_bottom)
+        hit_bottom = (bird_top < bottom_pipe_top + config.PIPE_HEIGHT) & (bottom_pipe_top < bird_bottom)
+        hit_pipe = (ahead & overlap_x & (hit_top | hit_bottom)).any(axis=1)
+        hit = hit_pipe | (self.bird_y + BIRD_HEIGHT >= config.SCREEN_HEIGHT) | (self.bird_y <= 0)
+        return pipe_passed, hit
+
+    def close(self):
+        """Nothing to release; kept for parity with FlyingBirdEnv"""
+        pass
+
+
+def check_parity(num_steps: int = 20000, seed: int = 0, frame_skip: int = 1):
+    """Step FlyingBirdEnv and FlyingBirdVecEnv side by side and assert identical transitions"""
+    from flying_bird_env import FlyingBirdEnv
+
+    # Both envs draw pipe heights from a PCG64 generator, one per spawn, so equal seeds give equal pipes
+    scalar_env = FlyingBirdEnv(render=False, seed=seed, frame_skip=frame_skip)
+    vec_env = FlyingBirdVecEnv(num_envs=1, seed=seed, frame_skip=frame_skip)
+    state = scalar_env.reset()
+    vec_obs = vec_env.reset()
+    assert np.array_equal(state, vec_obs[0]), (state, vec_obs[0])
+
+    action_rng = np.random.default_rng(seed)
+    episodes = 0
+    pipes_passed = 0
+    for t in range(num_steps):
+        # Steer towards the middle of the nearest gap, with some random actions mixed in,
+        # so that scoring, pipe collisions and edge collisions all get exercised
+        pipe = scalar_env.sim.pipes.next_ahead()
+        gap_y = pipe.gap_y if pipe is not None else PIPE_GAP_Y_HIGH
+        action = int(state[0] > gap_y + config.PIPE_GAP / 2)
+        if action_rng.random() < 0.02:
+            action = 1 - action
+        state, reward, done, _ = scalar_env.step(action)
+        vec_obs, vec_rewards, vec_dones, infos = vec_env.step(np.array([action]))
+        expected_obs = infos["final_observation"][0] if vec_dones[0] else vec_obs[0]
+        assert np.array_equal(state, expected_obs), (t, state, expected_obs)
+        assert reward == vec_rewards[0] and done == vec_dones[0], (t, reward, vec_rewards[0], done)
+        pipes_passed += max(reward, 0)
+        if done:
+            episodes += 1
+            state = scalar_env.reset()
+            assert np.array_equal(state, vec_obs[0]), (t, state, vec_obs[0])
+    return episodes, pipes_passed
+
+
+if __name__ == "__main__":
+    for frame_skip in (1, 4):
+        episodes, pipes_passed = check_parity(frame_skip=frame_skip)
+        print(f"Parity check (frame_skip={frame_skip}) passed over {episodes} episodes and {pipes_passed} scored pipes")
+
+    env = FlyingBirdVecEnv(num_envs=8, seed=0)
+    obs = env.reset()
+    for _ in range(1000):
+        actions = np.random.randint(0, 2, size=env.num_envs)
+        obs, rewards, dones, infos = env.step(actions)
+    print(f"Observations: {obs.shape}, Scores: {infos['score']}")
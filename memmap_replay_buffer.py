@@ -0,0 +1,109 @@
+# memmap_replay_buffer.py
+import json
+import mmap
+import os
+import numpy as np
+from replay_buffer import ReplayBuffer
+
+META_FILE = 'meta.json'
+COLUMN_NAMES = ('states', 'actions', 'rewards', 'next_states', 'dones')
+COLUMN_DTYPES = (np.float32, np.int64, np.float32, np.float32, np.float32)  # Same as ReplayBuffer
+
+
+class MemmapReplayBuffer(ReplayBuffer):
+    """Ring buffer whose columns are memory-mapped .npy files in a directory.
+
+    Only the pages touched by add() and sample() are resident, so the capacity
+    is bounded by disk rather than RAM, and the OS page cache keeps the hot
+    part of the buffer in memory. The columns are mapped for random access
+    (no read-ahead). flush() writes dirty pages and the ring cursors to disk;
+    constructing a buffer on a directory that already holds one reopens it
+    with its transitions, so a new run can warm-start from old experience.
+    """
+
+    def __init__(self, max_size: int, directory: str):
+        """Open the buffer stored in directory, or prepare an empty one there"""
+        super(MemmapReplayBuffer, self).__init__(max_size)
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+
+        meta_path = os.path.join(directory, META_FILE)
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+            if meta['max_size'] != max_size:
+                raise ValueError(f"replay buffer in {directory} has capacity {meta['max_size']}, not {max_size}")
+            self._open_columns('r+')
+            self.position = meta['position']
+            self.count = meta['count']
+
+    def _path(self, name: str):
+        """Return the file backing the named column"""
+        return os.path.join(self.directory, name + '.npy')
+
+    def _open_columns(self, mode: str, state_shape=None):
+        """Map the column files, creating them (mode 'w+') for states of the given shape"""
+        columns = []
+        for name, dtype, row_shape in zip(COLUMN_NAMES, COLUMN_DTYPES, (state_shape, (), (), state_shape, ())):
+            if mode == 'w+':
+                column = np.lib.format.open_memmap(self._path(name), mode=mode, dtype=dtype,
+                                                   shape=(self.max_size, *row_shape))
+            else:
+                column = np.lib.format.open_memmap(self._path(name), mode=mode)
+            # Sampling reads scattered rows; read-ahead would only evict hot pages. NumPy keeps the
+            # mmap object private, so the hint is skipped if it is not reachable
+            mapping = getattr(column, '_mmap', None)
+            if hasattr(mmap, 'MADV_RANDOM') and mapping is not None:
+                try:
+                    mapping.madvise(mmap.MADV_RANDOM)
+                except (AttributeError, OSError, ValueError):
+                    pass
+            columns.append(column)
+        self.states, self.actions, self.rewards, self.next_states, self.dones = columns
+
+    def _allocate(self, state_shape):
+        """Create the column files for states of the given shape"""
+        self._open_columns('w+', state_shape)
+        self.flush()
+
+    def flush(self):
+        """Write dirty pages and the ring cursors to disk, so the buffer can be reopened"""
+        if self.states is None:
+            return
+        for column in self.columns():
+            column.flush()
+        meta_path = os.path.join(self.directory, META_FILE)
+        with open(meta_path + '.tmp', 'w') as f:
+            json.dump({'max_size': self.max_size, 'position': self.position, 'count': self.count}, f)
+        os.replace(meta_path + '.tmp', meta_path)
+
+    def close(self):
+        """Flush and unmap the columns"""
+        self.flush()
+        self.states = self.actions = self.rewards = self.next_states = self.dones = None
+        self._batch = None
+
+
+if __name__ == "__main__":
+    import tempfile
+    import time
+
+    capacity, state_dim, batch_size = 10000000, 5, 64
+    with tempfile.TemporaryDirectory() as directory:
+        buffer = MemmapReplayBuffer(capacity, directory)
+        chunk = 100000
+        start = time.perf_counter()
+        for _ in range(capacity // chunk):
+            buffer.add_batch(np.random.rand(chunk, state_dim), np.random.randint(0, 2, chunk), np.zeros(chunk),
+                             np.random.rand(chunk, state_dim), np.zeros(chunk))
+        print(f"Filled {capacity} transitions in {time.perf_counter() - start:.1f} s")
+
+        start = time.perf_counter()
+        for _ in range(2000):
+            buffer.sample(batch_size)
+        print(f"sample: {(time.perf_counter() - start) / 2000 * 1e6:.1f} us per batch of {batch_size}")
+
+        buffer.close()
+        reopened = MemmapReplayBuffer(capacity, directory)
+        print(f"Reopened with {reopened.size()} transitions")
+        reopened.close()
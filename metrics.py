@@ -0,0 +1,118 @@
+# metrics.py
+import os
+import queue
+import threading
+import torch
+
+LOSS_FILE = 'losses.csv'
+EPISODE_FILE = 'episodes.csv'
+LOSS_COLUMNS = ('update', 'mean', 'min', 'max')
+EPISODE_COLUMNS = ('episode', 'step', 'reward', 'cumulative_reward', 'epsilon', 'steps_per_second')
+
+
+class MetricsWriter:
+    """Streams training metrics to CSV files in log_dir with bounded memory.
+
+    Losses stay on the device in a preallocated buffer and are reduced to one
+    (mean, min, max) row every aggregate_every updates, so there is one
+    device sync per row instead of one per update. Rows are written and
+    flushed by a background thread; the queue between the two is bounded.
+    A fresh writer truncates existing files. With resume_at=(episodes, updates)
+    it keeps the rows of the first `episodes` episodes and `updates` updates
+    and appends after them, so a run resumed from a checkpoint continues the
+    same log without the rows it is about to log again.
+    A failed write does not stop the thread; its exception is raised by the
+    next log_loss(), log_episode() or close().
+    """
+
+    def __init__(self, log_dir: str, aggregate_every: int = 100, device='cpu', max_queue: int = 1024,
+                 resume_at=None):
+        """Create (or truncate, or trim for resume_at) the CSV files and start the writer thread"""
+        os.makedirs(log_dir, exist_ok=True)
+        self.log_dir = log_dir
+        self.aggregate_every = aggregate_every
+        episodes, self.updates = (0, 0) if resume_at is None else resume_at
+        self._losses = torch.zeros(aggregate_every, device=device)
+        self._pending = 0
+
+        # Episode rows are numbered from 0, loss rows by the update count they end at
+        self._files = {
+            LOSS_FILE: self._open(LOSS_FILE, LOSS_COLUMNS, self.updates + 1 if resume_at else None),
+            EPISODE_FILE: self._open(EPISODE_FILE, EPISODE_COLUMNS, episodes if resume_at else None),
+        }
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._error = None  # Exception of the last failed write, raised in the caller's thread
+        self._thread = threading.Thread(target=self._write_loop, name='metrics-writer', daemon=True)
+        self._thread.start()
+
+    def _open(self, name: str, columns, keep_below=None):
+        """Open a CSV file with a fresh header; given keep_below, keep the old rows whose first column is smaller"""
+        path = os.path.join(self.log_dir, name)
+        rows = []
+        if keep_below is not None and os.path.exists(path):
+            with open(path) as f:
+                rows = [line for line in f.readlines()[1:] if line.strip() and int(line.split(',', 1)[0]) < keep_below]
+        f = open(path, 'w')
+        f.write(','.join(columns) + '\n')
+        f.writelines(rows)
+        f.flush()
+        return f
+
+    def _write_loop(self):
+        """Background thread: write queued rows until the None sentinel arrives"""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            name, row = item
+            try:
+                f = self._files[name]
+                f.write(','.join(repr(value) if isinstance(value, float) else str(value) for value in row) + '\n')
+                if self._queue.empty():
+                    f.flush()
+            except Exception as error:  # e.g. disk full; keep draining the queue so callers never block
+                self._error = error
+        for f in self._files.values():
+            try:
+                f.close()
+            except Exception as error:
+                self._error = error
+
+    def _raise_error(self):
+        """Re-raise the exception of a failed write, once"""
+        error, self._error = self._error, None
+        if error is not None:
+            raise RuntimeError(f"writing metrics to {self.log_dir} failed") from error
+
+    def log_loss(self, loss):
+        """Record the loss of one update without synchronizing with the device"""
+        self._raise_error()
+        self._losses[self._pending] = loss.detach()
+        self._pending += 1
+        self.updates += 1
+        if self._pending == self.aggregate_every:
+            self._flush_losses()
+
+    def _flush_losses(self):
+        """Reduce the buffered losses to one row (a single device sync) and queue it"""
+        if self._pending == 0:
+            return
+        losses = self._losses[:self._pending]
+        mean, low, high = torch.stack((losses.mean(), losses.min(), losses.max())).tolist()
+        self._pending = 0
+        self._queue.put((LOSS_FILE, (self.updates, mean, low, high)))
+
+    def log_episode(self, episode: int, step: int, reward: float, cumulative_reward: float, epsilon: float,
+                    steps_per_second: float):
+        """Queue one row for a finished episode"""
+        self._raise_error()
+        self._queue.put((EPISODE_FILE, (episode, step, float(reward), float(cumulative_reward), float(epsilon),
+                                        float(steps_per_second))))
+
+    def close(self):
+        """Write out any buffered losses, then stop the writer thread once the queue is drained"""
+        if self._thread.is_alive():
+            self._flush_losses()
+            self._queue.put(None)
+            self._thread.join()
+        self._raise_error()
@@ -0,0 +1,94 @@
+# pacing.py
+import time
+import config
+
+
+class Clock:
+    """Base pacing clock: call tick() once per environment step.
+
+    Subclasses decide how long to wait between steps. Every clock tracks the
+    achieved step rate so throughput can be reported regardless of the mode.
+    """
+
+    def __init__(self):
+        """Initialize step counters"""
+        self.start_time = time.perf_counter()
+        self.total_steps = 0
+        self.window_start = self.start_time
+        self.window_steps = 0
+
+    def wait(self, now: float):
+        """Block until the next step is allowed; the base clock never waits"""
+        pass
+
+    def tick(self):
+        """Pace the caller and count one step"""
+        self.wait(time.perf_counter())
+        self.total_steps += 1
+        self.window_steps += 1
+
+    def steps_per_second(self):
+        """Return the average step rate since the last call (or since creation) and start a new window"""
+        now = time.perf_counter()
+        elapsed = now - self.window_start
+        rate = self.window_steps / elapsed if elapsed > 0 else 0.0
+        self.window_start = now
+        self.window_steps = 0
+        return rate
+
+    def average_steps_per_second(self):
+        """Return the average step rate since the clock was created"""
+        elapsed = time.perf_counter() - self.start_time
+        return self.total_steps / elapsed if elapsed > 0 else 0.0
+
+
+class TurboClock(Clock):
+    """Runs as fast as possible; only measures throughput"""
+    pass
+
+
+class FixedRateClock(Clock):
+    """Caps the loop at a fixed number of steps per second"""
+
+    def __init__(self, rate: float):
+        """Initialize the clock with a target rate in steps per second"""
+        super(FixedRateClock, self).__init__()
+        self.period = 1.0 / rate
+        self.next_deadline = None
+
+    def wait(self, now: float):
+        """Sleep until the next deadline, without accumulating drift from slow steps"""
+        if self.next_deadline is None or now - self.next_deadline > self.period:
+            # First step, or we fell more than a step behind: restart the schedule from now
+            self.next_deadline = now
+        elif now < self.next_deadline:
+            time.sleep(self.next_deadline - now)
+        self.next_deadline += self.period
+
+
+class RealTimeClock(FixedRateClock):
+    """Runs at the game's own frame rate, for watching a run"""
+
+    def __init__(self):
+        """Initialize the clock at config.FPS"""
+        super(RealTimeClock, self).__init__(config.FPS)
+
+
+PACING_MODES = ('realtime', 'fixed', 'turbo')
+
+
+def make_clock(mode=None, render: bool = False, rate: float = config.FPS_TRAINING):
+    """Create a pacing clock.
+
+    mode is one of 'realtime', 'fixed' or 'turbo'. If it is None, rendered runs
+    use real time and headless runs use turbo. rate is only used by 'fixed'.
+    """
+    if mode is None:
+        mode = 'realtime' if render else 'turbo'
+    if mode == 'realtime':
+        return RealTimeClock()
+    if mode == 'fixed':
+        return FixedRateClock(rate)
+    if mode == 'turbo':
+        return TurboClock()
+    raise ValueError(f"Unknown pacing mode {mode!r}, expected one of {PACING_MODES}")
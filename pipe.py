@@ -1,29 +1,42 @@
-import pygame
-import random
+import numpy as np
 import config
 
 class Pipe:
-    """Class to handle pipe properties and movement"""
-
-    def __init__(self, x: int):
-        """Initialize pipe pair (top and bottom) at x-coordinate"""
-        self.image = pygame.image.load(config.PIPE_IMAGE_PATH).convert_alpha()
-        self.image = pygame.transform.scale(self.image, config.PIPE_SCALE)  # Rescale pipe image
-        self.rect_top = self.image.get_rect(midbottom=(x, random.randint(100, config.SCREEN_HEIGHT - config.PIPE_GAP - 100)))
-        self.rect_bottom = self.image.get_rect(midtop=(x, self.rect_top.bottom + config.PIPE_GAP))
+    """Pipe pair physics: float x of the left edge and y of the top of the gap between the two pipes"""
+
+    __slots__ = ('rng', 'x', 'gap_y', 'passed')
+
+    def __init__(self, x: float, rng=None):
+        """Initialize pipe pair at x-coordinate; gap heights are drawn from rng (a NumPy Generator)"""
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.reset(x)
+
+    def reset(self, x: float):
+        """Place the pipe pair at x-coordinate with a new random gap height"""
+        self.place(x, float(self.rng.integers(config.PIPE_GAP_Y_MIN, config.PIPE_GAP_Y_MAX, endpoint=True)))
+
+    def place(self, x: float, gap_y: float):
+        """Place the pipe pair at x-coordinate with the gap starting at gap_y"""
+        self.x = float(x)
+        self.gap_y = float(gap_y)
         self.passed = False  # Track if the bird has passed this pipe
 
     def move(self):
         """Move the pipe to the left"""
-        self.rect_top.x -= config.PIPE_VELOCITY
-        self.rect_bottom.x -= config.PIPE_VELOCITY
+        self.x -= config.PIPE_VELOCITY
+
+    def collides(self, left: float, top: float, right: float, bottom: float):
+        """Check if the box overlaps the top pipe (ending at gap_y) or the bottom pipe (starting PIPE_GAP below)"""
+        if right <= self.x or left >= self.x + config.PIPE_WIDTH:
+            return False
+        bottom_pipe_top = self.gap_y + config.PIPE_GAP
+        return ((top < self.gap_y and bottom > self.gap_y - config.PIPE_HEIGHT)
+                or (top < bottom_pipe_top + config.PIPE_HEIGHT and bottom > bottom_pipe_top))
 
-    def draw(self, screen):
-        """Draw top and bottom pipes if rendering is enabled"""
-        if screen is not None:
-            screen.blit(self.image, self.rect_top)
-            screen.blit(self.image, self.rect_bottom)
+    def is_behind(self, x):
+        """Check if the pipe's right edge is left of x-coordinate"""
+        return self.x + config.PIPE_WIDTH < x
 
     def is_off_screen(self):
         """Check if the pipe has moved completely off the screen"""
-        return self.rect_top.right < 0
\ No newline at end of file
+        return self.x + config.PIPE_WIDTH < 0
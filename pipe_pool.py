@@ -0,0 +1,98 @@
+# pipe_pool.py
+import config
+
+
+class PipePool:
+    """Fixed-capacity ring of reusable pipes, iterated oldest first.
+
+    Pipes all scroll left at the same speed, so they stay ordered by x and
+    leave the screen in the order they were spawned: spawning writes the slot
+    after the newest pipe and removal only ever advances the head. A cursor
+    marks the first pipe the bird has not passed yet, so scoring, collision and
+    the observation only need to look at the pipes from the cursor on.
+    A slot's pipe object is created the first time the slot is used and
+    recycled with pipe.reset(x) afterwards.
+    """
+
+    __slots__ = ('factory', 'slots', 'head', 'count', 'passed_count')
+
+    def __init__(self, factory, capacity: int = config.PIPE_POOL_SIZE):
+        """Initialize an empty pool; factory(x) creates a new pipe at x-coordinate"""
+        self.factory = factory
+        self.slots = [None] * capacity
+        self.head = 0
+        self.count = 0
+        self.passed_count = 0  # Pipes from the head that are behind the bird; the cursor
+
+    def spawn(self, x):
+        """Activate a pipe at x-coordinate after the newest one and return it"""
+        if self.count == len(self.slots):
+            self._grow()
+        slot = (self.head + self.count) % len(self.slots)
+        pipe = self.slots[slot]
+        if pipe is None:
+            pipe = self.slots[slot] = self.factory(x)
+        else:
+            pipe.reset(x)
+        self.count += 1
+        return pipe
+
+    def _grow(self):
+        """Double the capacity, keeping the active pipes in order (only when more pipes than slots are on screen)"""
+        capacity = len(self.slots)
+        ordered = [self.slots[(self.head + i) % capacity] for i in range(capacity)]
+        self.slots = ordered + [None] * capacity
+        self.head = 0
+
+    def release_off_screen(self):
+        """Return pipes that have left the screen to the pool"""
+        while self.count and self.slots[self.head].is_off_screen():
+            self.head = (self.head + 1) % len(self.slots)
+            self.count -= 1
+            self.passed_count = max(self.passed_count - 1, 0)
+
+    def pass_pipes(self, x):
+        """Advance the cursor past pipes whose right edge is left of x; return how many were passed"""
+        passed = 0
+        while self.passed_count < self.count:
+            pipe = self[self.passed_count]
+            if not pipe.is_behind(x):
+                break
+            pipe.passed = True
+            self.passed_count += 1
+            passed += 1
+        return passed
+
+    def next_ahead(self):
+        """Return the nearest pipe the bird has not passed yet, or None"""
+        if self.passed_count < self.count:
+            return self[self.passed_count]
+        return None
+
+    def ahead(self):
+        """Iterate over the pipes the bird has not passed yet, nearest first"""
+        for i in range(self.passed_count, self.count):
+            yield self[i]
+
+    def clear(self):
+        """Return every pipe to the pool"""
+        self.head = 0
+        self.count = 0
+        self.passed_count = 0
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        """Return the i-th active pipe, oldest first"""
+        if i < 0:
+            i += self.count
+        if not 0 <= i < self.count:
+            raise IndexError('pipe index out of range')
+        return self.slots[(self.head + i) % len(self.slots)]
+
+    def __iter__(self):
+        slots = self.slots
+        capacity = len(slots)
+        for i in range(self.count):
+            yield slots[(self.head + i) % capacity]
@@ -0,0 +1,133 @@
+# pixel_observation.py
+import numpy as np
+import pygame
+import config
+from renderer import SurfaceRenderer
+
+GRAY_WEIGHTS = (77, 150, 29)  # ITU-R BT.601 luma weights in 1/256ths (they sum to 256)
+
+
+class OffscreenRenderer:
+    """Draws a simulation.Simulation onto an offscreen surface whose pixels are a NumPy array.
+
+    The surface is created over a preallocated (height, width, 4) RGBX array,
+    so no display, window or audio device is needed and reading a frame copies
+    nothing: rgb is a view of the pixels the blits just wrote. Drawing at a
+    reduced size downsamples for free, since the images are scaled once up
+    front instead of every frame.
+    """
+
+    def __init__(self, size=(config.SCREEN_WIDTH, config.SCREEN_HEIGHT), draw_score: bool = False):
+        """Allocate the pixel array for a (width, height) surface and prepare the renderer"""
+        width, height = size
+        self.pixels = np.zeros((height, width, 4), dtype=np.uint8)
+        self.surface = pygame.image.frombuffer(self.pixels, size, 'RGBX')  # Shares memory with self.pixels
+        self.renderer = SurfaceRenderer(self.surface, draw_score)
+        self.rgb = self.pixels[..., :3]  # (height, width, 3) view, valid until the next draw()
+        self._luma = np.empty((height, width), dtype=np.uint16)
+
+    def draw(self, sim):
+        """Draw sim and return the (height, width, 3) RGB view of the frame"""
+        self.renderer.draw_frame(sim)
+        return self.rgb
+
+    def grayscale(self, out):
+        """Write the luma of the last frame drawn into the uint8 (height, width) array out and return it"""
+        luma = self._luma
+        red, green, blue = GRAY_WEIGHTS
+        np.multiply(self.pixels[..., 0], red, out=luma, dtype=np.uint16)
+        luma += self.pixels[..., 1] * np.uint16(green)
+        luma += self.pixels[..., 2] * np.uint16(blue)
+        np.right_shift(luma, 8, out=out, casting='unsafe')
+        return out
+
+
+class FrameStack:
+    """The last k frames, oldest first, in a preallocated ring buffer.
+
+    Every frame is written twice, at slot i and i + k, so the k most recent
+    frames are always one contiguous slice of the buffer and stack() never
+    has to reorder or concatenate them.
+    """
+
+    def __init__(self, k: int, frame_shape, dtype=np.uint8):
+        """Allocate room for 2k frames of frame_shape"""
+        self.k = k
+        self.frames = np.zeros((2 * k, *frame_shape), dtype=dtype)
+        self.index = 0  # Slot the next frame is written to
+
+    @property
+    def shape(self):
+        """Shape of the stacked observation, (k, *frame_shape)"""
+        return (self.k, *self.frames.shape[1:])
+
+    def push(self, frame):
+        """Append frame, dropping the oldest one"""
+        index = self.index
+        self.frames[index] = frame
+        self.frames[index + self.k] = frame
+        self.index = (index + 1) % self.k
+
+    def fill(self, frame):
+        """Make frame every one of the k frames (at the start of an episode)"""
+        self.frames[:] = frame
+        self.index = 0
+
+    def stack(self):
+        """Return a (k, *frame_shape) view of the frames, oldest first; it changes with the next push()"""
+        return self.frames[self.index:self.index + self.k]
+
+
+class PixelObserver:
+    """Builds stacked pixel observations of a Simulation: the last k downsampled frames, RGB or grayscale"""
+
+    def __init__(self, size=config.PIXEL_OBS_SIZE, grayscale: bool = True, frame_stack: int = config.FRAME_STACK):
+        """Prepare an offscreen (width, height) renderer and a k-frame stack"""
+        width, height = size
+        self.offscreen = OffscreenRenderer(size)
+        self.grayscale = grayscale
+        self.gray = np.empty((height, width), dtype=np.uint8) if grayscale else None
+        self.frames = FrameStack(frame_stack, (height, width) if grayscale else (height, width, 3))
+
+    @property
+    def shape(self):
+        """Shape of an observation: (k, height, width) for grayscale, (k, height, width, 3) for RGB"""
+        return self.frames.shape
+
+    def capture(self, sim):
+        """Draw sim and return the new frame (a view reused by the next capture)"""
+        rgb = self.offscreen.draw(sim)
+        return self.offscreen.grayscale(self.gray) if self.grayscale else rgb
+
+    def reset(self, sim):
+        """Start a new stack filled with the current frame of sim and return it"""
+        self.frames.fill(self.capture(sim))
+        return self.frames.stack()
+
+    def observe(self, sim):
+        """Push the current frame of sim and return the stack (a view; copy it to keep it)"""
+        self.frames.push(self.capture(sim))
+        return self.frames.stack()
+
+
+if __name__ == "__main__":
+    import time
+    from simulation import Simulation
+
+    sim = Simulation(seed=0)
+    for grayscale in (True, False):
+        observer = PixelObserver(grayscale=grayscale)
+        observer.reset(sim)
+        steps = 20000
+        start = time.perf_counter()
+        for _ in range(steps):
+            pipe = sim.pipes.next_ahead()
+            _, done = sim.step(pipe is not None and sim.bird.y > pipe.gap_y + config.PIPE_GAP / 2)
+            if done:
+                sim.reset()
+                observer.reset(sim)
+            else:
+                observer.observe(sim)
+        elapsed = time.perf_counter() - start
+        mode = 'grayscale' if grayscale else 'rgb'
+        print(f"{mode:<10} observation {observer.shape}: {steps / elapsed:,.0f} frames/s")
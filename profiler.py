@@ -0,0 +1,112 @@
+# profiler.py
+import json
+import time
+import numpy as np
+
+perf_counter_ns = time.perf_counter_ns
+
+
+class PhaseTimer:
+    """Timings of one named phase: running totals plus a ring of the most recent samples"""
+
+    __slots__ = ('count', 'total_ns', 'window', 'cursor')
+
+    def __init__(self, window: int):
+        self.count = 0
+        self.total_ns = 0
+        self.window = np.zeros(window, dtype=np.int64)
+        self.cursor = 0
+
+    def add(self, elapsed_ns: int):
+        """Record one sample"""
+        self.count += 1
+        self.total_ns += elapsed_ns
+        self.window[self.cursor] = elapsed_ns
+        self.cursor = (self.cursor + 1) % len(self.window)
+
+    def recent(self):
+        """Return the samples currently in the window"""
+        return self.window[:min(self.count, len(self.window))]
+
+
+class PhaseProfiler:
+    """Opt-in accumulator of per-phase wall-clock timings.
+
+    Instrumented code holds a reference that is None when profiling is off, so
+    the disabled cost is one `is not None` check per phase:
+
+        prof = self.profiler
+        if prof is not None:
+            t = prof.now()
+        ...  # work
+        if prof is not None:
+            t = prof.lap('physics', t)
+
+    Each phase keeps totals and a rolling window of recent samples, from which
+    summary() reports p50/p90/p99 and a log2 histogram. maybe_dump() appends a
+    JSON line with the summary to dump_path every dump_interval seconds.
+    """
+
+    def __init__(self, window: int = 4096, dump_path=None, dump_interval: float = 30.0):
+        """Initialize an empty profiler"""
+        self.window = window
+        self.dump_path = dump_path
+        self.dump_interval = dump_interval
+        self.phases = {}
+        self.last_dump = time.monotonic()
+
+    now = staticmethod(perf_counter_ns)
+
+    def lap(self, phase: str, start_ns: int):
+        """Record the time since start_ns under phase and return the current time for the next lap"""
+        end_ns = perf_counter_ns()
+        timer = self.phases.get(phase)
+        if timer is None:
+            timer = self.phases[phase] = PhaseTimer(self.window)
+        timer.add(end_ns - start_ns)
+        return end_ns
+
+    def summary(self):
+        """Return {phase: statistics}, with times in microseconds"""
+        stats = {}
+        for phase, timer in self.phases.items():
+            recent = timer.recent() / 1000.0
+            p50, p90, p99 = np.percentile(recent, [50, 90, 99]) if len(recent) else (0.0, 0.0, 0.0)
+            # Log2 buckets: bucket k counts samples in [2^k, 2^(k+1)) microseconds
+            buckets = np.bincount(np.floor(np.log2(np.maximum(recent, 1.0))).astype(np.int64))
+            stats[phase] = {
+                'count': timer.count,
+                'total_ms': timer.total_ns / 1e6,
+                'mean_us': timer.total_ns / timer.count / 1000.0,
+                'p50_us': float(p50),
+                'p90_us': float(p90),
+                'p99_us': float(p99),
+                'log2_us_histogram': buckets.tolist(),
+            }
+        return stats
+
+    def dump(self, path=None):
+        """Append the current summary as one JSON line"""
+        path = path or self.dump_path
+        if path is None:
+            return
+        with open(path, 'a') as f:
+            f.write(json.dumps({'time': time.time(), 'phases': self.summary()}) + '\n')
+        self.last_dump = time.monotonic()
+
+    def maybe_dump(self):
+        """Dump if dump_interval seconds have passed since the last dump"""
+        if self.dump_path is not None and time.monotonic() - self.last_dump >= self.dump_interval:
+            self.dump()
+
+    def report(self):
+        """Return a human-readable table of the phases, slowest total first"""
+        stats = self.summary()
+        # Nested phases ('sim/physics' inside 'env_step') are shown as a share of the top-level total
+        top_level = [s['total_ms'] for phase, s in stats.items() if '/' not in phase]
+        total_ms = sum(top_level or [s['total_ms'] for s in stats.values()]) or 1.0
+        lines = [f"{'phase':<24}{'count':>10}{'total ms':>12}{'share':>8}{'mean us':>10}{'p50 us':>10}{'p99 us':>10}"]
+        for phase, s in sorted(stats.items(), key=lambda item: -item[1]['total_ms']):
+            lines.append(f"{phase:<24}{s['count']:>10}{s['total_ms']:>12.1f}{s['total_ms'] / total_ms:>8.1%}"
+                         f"{s['mean_us']:>10.1f}{s['p50_us']:>10.1f}{s['p99_us']:>10.1f}")
+        return '\n'.join(lines)
@@ -0,0 +1,181 @@
+# renderer.py
+import time
+import pygame
+import config
+import asset_cache
+
+SCORE_POSITION = (10, 10)
+SCORE_COLOR = (0, 0, 255)
+
+
+class SurfaceRenderer:
+    """Draws a simulation.Simulation onto a pygame Surface, optionally scaled down.
+
+    Needs no window, display or audio, so it also serves offscreen pixel
+    observations. The images are scaled once to the target resolution and the
+    two background tiles are composited into one strip, so a frame is a
+    handful of blits. Positions are rounded to pixels only here.
+    """
+
+    def __init__(self, surface, draw_score: bool = True):
+        """Prepare to draw onto surface, scaling the game's SCREEN_WIDTH x SCREEN_HEIGHT to its size"""
+        self.surface = surface
+        width, height = surface.get_size()
+        self.scale_x = width / config.SCREEN_WIDTH
+        self.scale_y = height / config.SCREEN_HEIGHT
+
+        # Shared, rescaled images (converted for the display if there is one)
+        self.bird_image = asset_cache.load_image(config.BIRD_IMAGE_PATH, self.scaled_size(config.BIRD_SCALE))
+        self.pipe_image = asset_cache.load_image(config.PIPE_IMAGE_PATH, self.scaled_size(config.PIPE_SCALE))
+        background_image = asset_cache.load_image(config.BACKGROUND_IMAGE_PATH,
+                                                  self.scaled_size(config.BACKGROUND_SCALE))
+
+        # Two background tiles side by side, so any scroll offset is one blit of a window of the strip
+        tile_width = background_image.get_width()
+        self.background_strip = pygame.Surface((2 * tile_width, height), 0, surface)
+        self.background_strip.fill(config.COLOR_BLACK)
+        self.background_strip.blit(background_image, (0, 0))
+        self.background_strip.blit(background_image, (tile_width, 0))
+        self.pipe_height = round(config.PIPE_HEIGHT * self.scale_y)
+        self.pipe_gap = round(config.PIPE_GAP * self.scale_y)
+
+        self.font = None
+        if draw_score:
+            pygame.font.init()
+            self.font = pygame.font.Font(None, 36)
+        self.score = None
+        self.score_surface = None
+
+    def scaled_size(self, size):
+        """Scale a (width, height) in game pixels to surface pixels"""
+        return max(1, round(size[0] * self.scale_x)), max(1, round(size[1] * self.scale_y))
+
+    def score_text(self, score: int):
+        """Return the rendered score text, re-rendering it only when the score changed"""
+        if score != self.score:
+            self.score = score
+            self.score_surface = self.font.render(f"Score: {score}", True, SCORE_COLOR)
+        return self.score_surface
+
+    def draw_background(self, sim):
+        """Draw the scrolled background over the whole surface"""
+        background = sim.background
+        offset = -round(min(background.x1, background.x2) * self.scale_x)
+        self.surface.blit(self.background_strip, (0, 0), (offset, 0, *self.surface.get_size()))
+
+    def draw_sprites(self, sim):
+        """Draw the bird, pipes and score and return their rects"""
+        surface = self.surface
+        scale_x, scale_y = self.scale_x, self.scale_y
+        rects = [surface.blit(self.bird_image, (round(sim.bird.x * scale_x), round(sim.bird.y * scale_y)))]
+        for pipe in sim.pipes:
+            x = round(pipe.x * scale_x)
+            gap_y = round(pipe.gap_y * scale_y)
+            rects.append(surface.blit(self.pipe_image, (x, gap_y - self.pipe_height)))
+            rects.append(surface.blit(self.pipe_image, (x, gap_y + self.pipe_gap)))
+        if self.font is not None:
+            rects.append(surface.blit(self.score_text(sim.score), SCORE_POSITION))
+        return rects
+
+    def draw_frame(self, sim):
+        """Draw a complete frame of sim"""
+        self.draw_background(sim)
+        self.draw_sprites(sim)
+
+
+class Renderer(SurfaceRenderer):
+    """Draws a simulation.Simulation in a window with pygame and reads the player's input.
+
+    The display, fonts, images, sounds and events all live in this module (and
+    pixel_observation for offscreen frames), so a headless Simulation never
+    imports pygame.
+
+    Per frame the work is kept small: the background strip is drawn with a
+    single blit and the score text is rendered only when the score changes.
+    With scroll_background=False the background is static, so each frame only
+    erases and redraws the rects of the bird, pipes and score and updates just
+    those on the display. max_fps caps the drawn frame rate independently of
+    how often draw() is called: extra calls return without drawing, so the
+    simulation can run faster than the display.
+    """
+
+    def __init__(self, caption: str = 'Flying Bird Game', max_fps=None, scroll_background: bool = True):
+        """Open the game window and load the images, font and sounds"""
+        pygame.init()
+        screen = pygame.display.set_mode((config.SCREEN_WIDTH, config.SCREEN_HEIGHT))
+        pygame.display.set_caption(caption)
+        super(Renderer, self).__init__(screen)
+        self.screen = screen
+        self.clock = pygame.time.Clock()
+
+        self.scroll_background = scroll_background
+        self.min_frame_interval = 1.0 / max_fps if max_fps else 0.0
+        self.last_frame_time = None
+        self.dirty_rects = None  # Rects drawn in the last frame (static background only); None forces a full redraw
+
+        # Loaded up front, not at the moment they are played; without an audio device the game runs silently
+        try:
+            self.flap_sound = asset_cache.load_sound(config.FLAP_SOUND_PATH)
+            self.hit_sound = asset_cache.load_sound(config.HIT_SOUND_PATH)
+        except pygame.error:
+            self.flap_sound = self.hit_sound = None
+
+    def play_flap(self):
+        """Play the flap sound, if there is audio"""
+        if self.flap_sound is not None:
+            self.flap_sound.play()
+
+    def play_hit(self):
+        """Play the hit sound, if there is audio"""
+        if self.hit_sound is not None:
+            self.hit_sound.play()
+
+    def poll_events(self):
+        """Handle pending window events and return (quit requested, flap key pressed)"""
+        quit_requested = False
+        flap = False
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                quit_requested = True
+            if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                self.invalidate()  # The window was uncovered, so the sprite-only update would leave stale areas
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE:
+                flap = True
+        return quit_requested, flap
+
+    def draw(self, sim):
+        """Draw sim and update the display; return False if the frame was skipped because of max_fps"""
+        now = time.perf_counter()
+        if self.last_frame_time is not None and now - self.last_frame_time < self.min_frame_interval:
+            return False
+        self.last_frame_time = now
+
+        screen = self.screen
+        if self.scroll_background:
+            # Everything moves, so the whole window is redrawn from the strip
+            self.draw_frame(sim)
+            pygame.display.update()
+        elif self.dirty_rects is None:
+            screen.blit(self.background_strip, (0, 0))
+            self.dirty_rects = self.draw_sprites(sim)
+            pygame.display.update()
+        else:
+            # Erase last frame's sprites by restoring the background under them, then redraw
+            previous = self.dirty_rects
+            for rect in previous:
+                screen.blit(self.background_strip, rect, rect)
+            self.dirty_rects = self.draw_sprites(sim)
+            pygame.display.update(previous + self.dirty_rects)
+        return True
+
+    def invalidate(self):
+        """Force the next draw() to redraw the whole window (e.g. after the window was covered)"""
+        self.dirty_rects = None
+
+    def tick(self, fps: int = config.FPS):
+        """Wait so that frames are shown at most fps times per second"""
+        self.clock.tick(fps)
+
+    def close(self):
+        """Close the window"""
+        pygame.quit()
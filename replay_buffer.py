@@ -1,23 +1,281 @@
 # replay_buffer.py
-import random
 import numpy as np
-from collections import deque
 
 class ReplayBuffer:
+    """Fixed-capacity ring buffer storing transitions in preallocated typed columns.
+
+    The columns are allocated on the first add, once the state shape is known.
+    sample() gathers into reusable output arrays, so the returned batch is only
+    valid until the next call to sample().
+    """
+
     def __init__(self, max_size: int):
         """Initialize the Replay Buffer with a max size"""
-        self.buffer = deque(maxlen=max_size)
+        self.max_size = max_size
+        self.position = 0  # Write cursor: index of the next slot to overwrite
+        self.count = 0  # Number of valid transitions stored
+
+        self.states = None
+        self.actions = None
+        self.rewards = None
+        self.next_states = None
+        self.dones = None
+        self._batch = None
+        self._batch_size = 0
+
+    def _allocate(self, state_shape):
+        """Allocate the storage columns for states of the given shape"""
+        self.states = np.zeros((self.max_size, *state_shape), dtype=np.float32)
+        self.actions = np.zeros(self.max_size, dtype=np.int64)
+        self.rewards = np.zeros(self.max_size, dtype=np.float32)
+        self.next_states = np.zeros((self.max_size, *state_shape), dtype=np.float32)
+        self.dones = np.zeros(self.max_size, dtype=np.float32)
+
+    def columns(self):
+        """Return the storage columns in (state, action, reward, next_state, done) order"""
+        return self.states, self.actions, self.rewards, self.next_states, self.dones
 
     def add(self, experience):
-        """Add a new experience to the buffer"""
-        self.buffer.append(experience)
+        """Add a new experience (state, action, reward, next_state, done) to the buffer"""
+        state, action, reward, next_state, done = experience
+        if self.states is None:
+            self._allocate(np.shape(state))
+
+        i = self.position
+        self.states[i] = state
+        self.actions[i] = action
+        self.rewards[i] = reward
+        self.next_states[i] = next_state
+        self.dones[i] = done
+
+        self.position = (i + 1) % self.max_size
+        self.count = min(self.count + 1, self.max_size)
+
+    def add_batch(self, states, actions, rewards, next_states, dones):
+        """Add a batch of experiences, e.g. one step of a vectorized env, with one write per column"""
+        states = np.asarray(states)
+        n = len(states)
+        if self.states is None:
+            self._allocate(states.shape[1:])
+        if n > self.max_size:
+            # Only the most recent max_size transitions would survive anyway
+            states, actions, rewards, next_states, dones = (
+                np.asarray(column)[-self.max_size:] for column in (states, actions, rewards, next_states, dones))
+            n = self.max_size
+
+        indices = (self.position + np.arange(n)) % self.max_size
+        self.states[indices] = states
+        self.actions[indices] = actions
+        self.rewards[indices] = rewards
+        self.next_states[indices] = next_states
+        self.dones[indices] = dones
+
+        self.position = (self.position + n) % self.max_size
+        self.count = min(self.count + n, self.max_size)
+
+    def sample_indices(self, batch_size: int):
+        """Draw batch_size indices uniformly (with replacement) from the stored transitions"""
+        return np.random.randint(0, self.count, size=batch_size)
+
+    def gather(self, indices):
+        """Gather the transitions at the given indices into the reusable batch arrays"""
+        batch_size = len(indices)
+        if self._batch is None or self._batch_size != batch_size:
+            self._batch = tuple(np.empty((batch_size, *column.shape[1:]), dtype=column.dtype)
+                                for column in self.columns())
+            self._batch_size = batch_size
+        for column, out in zip(self.columns(), self._batch):
+            np.take(column, indices, axis=0, out=out)
+        return self._batch
 
     def sample(self, batch_size: int):
         """Sample a batch of experiences from the buffer"""
-        indices = np.random.choice(len(self.buffer), batch_size, replace=False)
-        batch = [self.buffer[idx] for idx in indices]
-        return map(np.array, zip(*batch))  # returns tuple of (states, actions, rewards, next_states, dones)
+        return self.gather(self.sample_indices(batch_size))  # returns tuple of (states, actions, rewards, next_states, dones)
 
     def size(self):
         """Return the current size of the buffer"""
-        return len(self.buffer)
\ No newline at end of file
+        return self.count
+
+    def state_dict(self):
+        """Return the stored transitions and ring cursors (views into the columns, not copies)"""
+        state = {'position': self.position, 'count': self.count}
+        if self.states is not None:
+            # Slots [0, count) are the valid ones whether or not the ring has wrapped
+            state['columns'] = tuple(column[:self.count] for column in self.columns())
+        return state
+
+    def load_state_dict(self, state):
+        """Restore transitions and cursors saved by state_dict(), writing into this buffer's columns"""
+        if 'columns' in state:
+            states = state['columns'][0]
+            if self.states is None:
+                self._allocate(states.shape[1:])
+            for column, saved in zip(self.columns(), state['columns']):
+                column[:len(saved)] = saved
+        self.position = state['position']
+        self.count = state['count']
+
+
+class SegmentTree:
+    """Array-based binary segment tree over a power-of-two number of leaves.
+
+    Node 1 is the root, node i has children 2i and 2i+1, and leaf j lives at
+    node capacity + j. Updates are batched: all touched leaves are written at
+    once and their ancestors recomputed level by level, O(batch * log n).
+    """
+
+    def __init__(self, capacity: int, operation, neutral_element: float):
+        """Initialize the tree with every leaf set to the neutral element"""
+        self.capacity = 1
+        while self.capacity < capacity:
+            self.capacity *= 2
+        self.depth = self.capacity.bit_length() - 1
+        self.operation = operation
+        self.tree = np.full(2 * self.capacity, neutral_element, dtype=np.float64)
+        # Row i of this view holds the two children (2i, 2i + 1) of node i
+        self.children = self.tree.reshape(-1, 2)
+
+    def update(self, indices, values):
+        """Set the leaves at the given indices and refresh their ancestors"""
+        nodes = np.asarray(indices, dtype=np.int64) + self.capacity
+        self.tree[nodes] = values
+        for _ in range(self.depth):
+            # Duplicate parents just recompute the same value
+            nodes >>= 1
+            self.tree[nodes] = self.operation.reduce(self.children.take(nodes, axis=0), axis=1)
+
+    def __getitem__(self, indices):
+        """Return the leaf values at the given indices"""
+        return self.tree[np.asarray(indices) + self.capacity]
+
+    def reduce(self):
+        """Return the operation applied over all leaves"""
+        return self.tree[1]
+
+
+class SumTree(SegmentTree):
+    """Segment tree of sums that supports batched prefix-sum search"""
+
+    def __init__(self, capacity: int):
+        super(SumTree, self).__init__(capacity, np.add, 0.0)
+
+    def find_prefixsum_indices(self, prefixsums):
+        """For each prefix sum s, return the smallest leaf i with sum(leaves[:i + 1]) > s"""
+        prefixsums = np.array(prefixsums, dtype=np.float64)
+        nodes = np.ones(len(prefixsums), dtype=np.int64)
+        for _ in range(self.depth):
+            left_sums = self.children.take(nodes, axis=0)[:, 0]
+            go_right = prefixsums >= left_sums
+            prefixsums -= left_sums * go_right
+            nodes = 2 * nodes + go_right
+        return nodes - self.capacity
+
+
+class MinTree(SegmentTree):
+    """Segment tree of minimums"""
+
+    def __init__(self, capacity: int):
+        super(MinTree, self).__init__(capacity, np.minimum, np.inf)
+
+
+class PrioritizedReplayBuffer(ReplayBuffer):
+    """Replay buffer that samples transitions in proportion to priority ** alpha.
+
+    Priorities live in a sum-tree (for stratified sampling) and a min-tree (for
+    normalizing the importance-sampling weights). New transitions get the
+    highest priority seen so far; call update_priorities() with the TD errors
+    of each sampled batch.
+    """
+
+    def __init__(self, max_size: int, alpha: float = 0.6, epsilon: float = 1e-6):
+        """Initialize the buffer with a max size and the prioritization exponent alpha"""
+        super(PrioritizedReplayBuffer, self).__init__(max_size)
+        self.alpha = alpha
+        self.epsilon = epsilon  # Keeps zero-error transitions sampleable
+        self.max_priority = 1.0
+        self.sum_tree = SumTree(max_size)
+        self.min_tree = MinTree(max_size)
+
+    def _set_priorities(self, indices, priorities):
+        """Write raw priorities (before the alpha exponent) for the given indices"""
+        scaled = priorities ** self.alpha
+        self.sum_tree.update(indices, scaled)
+        self.min_tree.update(indices, scaled)
+
+    def add(self, experience):
+        """Add a new experience with maximal priority"""
+        index = self.position
+        super(PrioritizedReplayBuffer, self).add(experience)
+        self._set_priorities([index], self.max_priority)
+
+    def add_batch(self, states, actions, rewards, next_states, dones):
+        """Add a batch of experiences with maximal priority"""
+        n = min(len(states), self.max_size)
+        indices = (self.position + np.arange(n)) % self.max_size
+        super(PrioritizedReplayBuffer, self).add_batch(states, actions, rewards, next_states, dones)
+        self._set_priorities(indices, self.max_priority)
+
+    def sample_indices(self, batch_size: int):
+        """Stratified sampling: one index from each of batch_size equal slices of the total priority"""
+        total = self.sum_tree.reduce()
+        segment = total / batch_size
+        prefixsums = (np.arange(batch_size) + np.random.random_sample(batch_size)) * segment
+        indices = self.sum_tree.find_prefixsum_indices(prefixsums)
+        # Guard against floating point drift selecting an empty leaf past the end
+        return np.minimum(indices, self.count - 1)
+
+    def sample(self, batch_size: int, beta: float = 0.4):
+        """Sample a prioritized batch.
+
+        Returns (states, actions, rewards, next_states, dones, weights, indices), where
+        weights are the importance-sampling weights normalized so the largest is 1.
+        """
+        indices = self.sample_indices(batch_size)
+        states, actions, rewards, next_states, dones = self.gather(indices)
+
+        # w_i = (N * P(i)) ** -beta / max_j w_j, and max_j w_j comes from the smallest priority
+        weights = (self.sum_tree[indices] / self.min_tree.reduce()) ** -beta
+        return states, actions, rewards, next_states, dones, weights.astype(np.float32), indices
+
+    def update_priorities(self, indices, td_errors):
+        """Set the priorities of sampled transitions from their TD errors"""
+        priorities = np.abs(np.asarray(td_errors, dtype=np.float64)) + self.epsilon
+        self._set_priorities(indices, priorities)
+        self.max_priority = max(self.max_priority, priorities.max())
+
+    def state_dict(self):
+        """Return the transitions plus both priority trees and the running maximum priority"""
+        state = super(PrioritizedReplayBuffer, self).state_dict()
+        state.update(sum_tree=self.sum_tree.tree, min_tree=self.min_tree.tree, max_priority=self.max_priority)
+        return state
+
+    def load_state_dict(self, state):
+        """Restore a buffer saved by state_dict()"""
+        super(PrioritizedReplayBuffer, self).load_state_dict(state)
+        self.sum_tree.tree[:] = state['sum_tree']
+        self.min_tree.tree[:] = state['min_tree']
+        self.max_priority = state['max_priority']
+
+
+def benchmark_prioritized_sampling(capacity: int = 1000000, batch_size: int = 64, iterations: int = 2000):
+    """Time sample() + update_priorities() on a full buffer against uniform sampling"""
+    import time
+
+    state_dim = 5
+    results = {}
+    for name, buffer in (('uniform', ReplayBuffer(capacity)), ('prioritized', PrioritizedReplayBuffer(capacity))):
+        buffer.add_batch(np.random.rand(capacity, state_dim), np.random.randint(0, 2, capacity),
+                         np.zeros(capacity), np.random.rand(capacity, state_dim), np.zeros(capacity))
+        start = time.perf_counter()
+        for _ in range(iterations):
+            batch = buffer.sample(batch_size)
+            if name == 'prioritized':
+                buffer.update_priorities(batch[-1], np.random.rand(batch_size))
+        elapsed = time.perf_counter() - start
+        results[name] = elapsed / iterations * 1e6
+        print(f"{name:>11}: {results[name]:8.1f} us per batch of {batch_size} at capacity {capacity}")
+    return results
+
+
+if __name__ == "__main__":
+    benchmark_prioritized_sampling()
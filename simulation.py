@@ -0,0 +1,189 @@
+# simulation.py
+import functools
+import numpy as np
+import config
+from bird import Bird, BIRD_WIDTH, BIRD_HEIGHT
+from pipe import Pipe
+from background import Background
+from pipe_pool import PipePool
+
+# Layout of the flat array returned by Simulation.get_state(): fixed fields, then the
+# PCG64 state of the RNG as raw uint64 words, then (x, gap y) for every active pipe
+STATE_BIRD_Y, STATE_BIRD_VELOCITY, STATE_PIPE_TIMER, STATE_SPEED_FACTOR, STATE_SCORE, STATE_DONE, \
+    STATE_BACKGROUND_X1, STATE_BACKGROUND_X2, STATE_PIPE_COUNT, STATE_PASSED_COUNT = range(10)
+STATE_RNG = 10
+STATE_RNG_WORDS = 6
+STATE_PIPES = STATE_RNG + STATE_RNG_WORDS
+UINT64_MASK = (1 << 64) - 1
+
+
+class Simulation:
+    """Headless Flying Bird world: the bird, pipes, background, timers and score.
+
+    Positions are floats and nothing here imports pygame, so headless workers
+    never load it; Game and FlyingBirdEnv drive a Simulation and hand it to a
+    renderer.Renderer only when drawing. Pipe gap heights come from a per-world
+    PCG64 generator (np_random). speed_up is added to the speed factor every
+    frame, which shortens the interval between pipe spawns (Game uses it to
+    get harder over time; the env keeps it at 0).
+    """
+
+    def __init__(self, seed=None, speed_up: float = 0.0, profiler=None):
+        """Create the world and reset it"""
+        self.np_random = np.random.default_rng(seed)
+        self.speed_up = speed_up
+        self.profiler = profiler  # Optional PhaseProfiler timing the phases of step()
+
+        self.bird = Bird()
+        self.pipes = PipePool(functools.partial(Pipe, rng=self.np_random))  # Recycled pipe objects, oldest first
+        self.background = Background()
+        self.pipe_timer = 0
+        self.speed_factor = 1.0
+        self.score = 0
+        self.done = False
+        self.reset()
+
+    def reset(self):
+        """Put the bird at its start position with a single pipe on the way"""
+        self.bird.reset()
+        self.pipes.clear()
+        self.pipes.spawn(config.PIPE_SPAWN_X)
+        self.background.reset()
+        self.pipe_timer = 0
+        self.speed_factor = 1.0
+        self.score = 0
+        self.done = False
+
+    def step(self, flap: bool):
+        """Advance the world by one frame and return (pipes passed this frame, whether the game is over)"""
+        prof = self.profiler
+        if prof is not None:
+            t = prof.now()
+
+        # 1. Flap, then move the bird, background and pipes
+        self.speed_factor += self.speed_up
+        if flap:
+            self.bird.flap()
+        self.bird.update()
+        self.background.move()
+        for pipe in self.pipes:
+            pipe.move()
+        if prof is not None:
+            t = prof.lap('sim/physics', t)
+
+        # 2. Spawn pipes at regular intervals (shorter as the speed factor grows)
+        self.pipe_timer += 1
+        if self.pipe_timer > config.PIPE_SPAWN_INTERVAL / self.speed_factor:
+            self.pipes.spawn(config.PIPE_SPAWN_X)
+            self.pipe_timer = 0
+        if prof is not None:
+            t = prof.lap('sim/spawn', t)
+
+        # 3. Score the pipes the bird has passed and return off-screen ones to the pool
+        passed = self.pipes.pass_pipes(self.bird.x)
+        self.score += passed
+        self.pipes.release_off_screen()
+        if prof is not None:
+            t = prof.lap('sim/score', t)
+
+        # 4. Check for collisions
+        self.done = self.check_collision()
+        if prof is not None:
+            prof.lap('sim/collision', t)
+        return passed, self.done
+
+    def check_collision(self):
+        """Check for collisions between the bird and pipes or screen edges"""
+        left, top = self.bird.x, self.bird.y
+        right, bottom = left + BIRD_WIDTH, top + BIRD_HEIGHT
+        # Passed pipes are behind the bird; stop at the first pipe that starts beyond it
+        for pipe in self.pipes.ahead():
+            if pipe.x >= right:
+                break
+            if pipe.collides(left, top, right, bottom):
+                return True
+        return bottom >= config.SCREEN_HEIGHT or top <= 0
+
+    def crash_cause(self):
+        """Return what the bird hit: 'pipe', 'ground' or 'ceiling' (None while it is still flying)"""
+        left, top = self.bird.x, self.bird.y
+        right, bottom = left + BIRD_WIDTH, top + BIRD_HEIGHT
+        if any(pipe.collides(left, top, right, bottom) for pipe in self.pipes.ahead()):
+            return 'pipe'
+        if bottom >= config.SCREEN_HEIGHT:
+            return 'ground'
+        if top <= 0:
+            return 'ceiling'
+        return None
+
+    def observation(self):
+        """Build the observation vector from the current bird and pipe positions"""
+        # Bird's vertical center and velocity
+        bird_y = self.bird.centery
+        bird_vel = self.bird.velocity
+
+        # Position of the nearest pipe ahead of the bird
+        pipe = self.pipes.next_ahead()
+        pipe_x = pipe.x if pipe is not None else config.SCREEN_WIDTH
+
+        return np.array([
+            bird_y,                         # Bird's vertical position
+            bird_vel,                       # Bird's velocity
+            pipe_x - self.bird.x,           # Horizontal distance to the nearest pipe
+            config.SCREEN_HEIGHT - bird_y,  # Distance to the ground
+            bird_y,                         # Distance to the ceiling
+        ], dtype=np.float32)
+
+    def get_state(self):
+        """Return a snapshot of the world (bird, pipes, timers, score and RNG) as a flat float64 array.
+
+        The RNG words are stored bit for bit (as uint64 viewed as float64), so
+        set_state() of the snapshot reproduces the episode exactly, including
+        future pipe heights. Snapshots are plain arrays: copy, stack or pickle them freely.
+        """
+        pipes = self.pipes
+        snapshot = np.empty(STATE_PIPES + 2 * len(pipes), dtype=np.float64)
+        snapshot[:STATE_RNG] = (
+            self.bird.y, self.bird.velocity, self.pipe_timer, self.speed_factor, self.score, self.done,
+            self.background.x1, self.background.x2, len(pipes), pipes.passed_count)
+
+        rng_state = self.np_random.bit_generator.state
+        pcg = rng_state['state']
+        snapshot[STATE_RNG:STATE_PIPES].view(np.uint64)[:] = (
+            pcg['state'] >> 64, pcg['state'] & UINT64_MASK, pcg['inc'] >> 64, pcg['inc'] & UINT64_MASK,
+            rng_state['has_uint32'], rng_state['uinteger'])
+
+        pipe_state = snapshot[STATE_PIPES:].reshape(-1, 2)
+        for i, pipe in enumerate(pipes):
+            pipe_state[i] = pipe.x, pipe.gap_y
+        return snapshot
+
+    def set_state(self, snapshot):
+        """Restore a snapshot taken by get_state()"""
+        snapshot = np.asarray(snapshot, dtype=np.float64)
+        values = snapshot[:STATE_RNG].tolist()  # Python floats are much cheaper to unpack than NumPy scalars
+        self.bird.y = values[STATE_BIRD_Y]
+        self.bird.velocity = values[STATE_BIRD_VELOCITY]
+        self.pipe_timer = int(values[STATE_PIPE_TIMER])
+        self.speed_factor = values[STATE_SPEED_FACTOR]
+        self.score = int(values[STATE_SCORE])
+        self.done = bool(values[STATE_DONE])
+        self.background.x1 = values[STATE_BACKGROUND_X1]
+        self.background.x2 = values[STATE_BACKGROUND_X2]
+
+        # Spawning may draw gap heights from the RNG, so the RNG is restored afterwards
+        pipes = self.pipes
+        pipes.clear()
+        for x, gap_y in snapshot[STATE_PIPES:].reshape(-1, 2).tolist():
+            pipes.spawn(x).place(x, gap_y)
+        pipes.passed_count = int(values[STATE_PASSED_COUNT])
+        for i in range(pipes.passed_count):
+            pipes[i].passed = True
+
+        state_hi, state_lo, inc_hi, inc_lo, has_uint32, uinteger = snapshot[STATE_RNG:STATE_PIPES].view(np.uint64).tolist()
+        self.np_random.bit_generator.state = {
+            'bit_generator': 'PCG64',
+            'state': {'state': state_hi << 64 | state_lo, 'inc': inc_hi << 64 | inc_lo},
+            'has_uint32': has_uint32,
+            'uinteger': uinteger,
+        }
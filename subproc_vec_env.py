@@ -0,0 +1,207 @@
+# subproc_vec_env.py
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import numpy as np
+from flying_bird_vec_env import FlyingBirdVecEnv, OBS_DIM, make_observation_space
+
+# Commands sent to the workers as raw bytes (no pickling on the step path)
+CMD_STEP = b's'
+CMD_RESET = b'r'
+CMD_CLOSE = b'c'
+
+
+class SharedBuffers:
+    """NumPy views over one shared memory block holding every env's step inputs and outputs"""
+
+    # (name, per-env shape, dtype), laid out back to back in this order
+    LAYOUT = (
+        ('actions', (), np.int64),
+        ('obs', (OBS_DIM,), np.float32),
+        ('final_obs', (OBS_DIM,), np.float32),
+        ('rewards', (), np.float32),
+        ('dones', (), np.bool_),
+        ('scores', (), np.int64),
+    )
+
+    def __init__(self, num_envs: int, name=None):
+        """Create the block (name=None) or attach to an existing one by name"""
+        size = sum(num_envs * int(np.prod(shape)) * np.dtype(dtype).itemsize for _, shape, dtype in self.LAYOUT)
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+
+        offset = 0
+        for field, shape, dtype in self.LAYOUT:
+            array = np.ndarray((num_envs, *shape), dtype=dtype, buffer=self.shm.buf, offset=offset)
+            setattr(self, field, array)
+            offset += array.nbytes
+
+    def close(self):
+        """Drop the views and detach from the block"""
+        for field, _, _ in self.LAYOUT:
+            setattr(self, field, None)
+        self.shm.close()
+
+
+def _worker(conn, shm_name: str, num_envs: int, start: int, end: int, seed, frame_skip: int = 1):
+    """Worker process loop: owns envs [start, end) and steps them on command"""
+    shared = SharedBuffers(num_envs, name=shm_name)
+    env = FlyingBirdVecEnv(num_envs=end - start, seed=seed, frame_skip=frame_skip)
+    envs = slice(start, end)
+    try:
+        while True:
+            cmd = conn.recv_bytes()
+            if cmd == CMD_STEP:
+                obs, rewards, dones, infos = env.step(shared.actions[envs])
+                shared.obs[envs] = obs
+                shared.rewards[envs] = rewards
+                shared.dones[envs] = dones
+                shared.scores[envs] = infos['score']
+                if 'final_observation' in infos:
+                    shared.final_obs[envs] = infos['final_observation']
+            elif cmd == CMD_RESET:
+                shared.obs[envs] = env.reset()
+                shared.dones[envs] = False
+                shared.scores[envs] = 0
+            elif cmd == CMD_CLOSE:
+                break
+            conn.send_bytes(cmd)
+    except (KeyboardInterrupt, EOFError):
+        pass
+    finally:
+        env.close()
+        shared.close()
+        conn.close()
+
+
+class SubprocVecEnv:
+    """Runs num_envs Flying Bird games across worker processes.
+
+    Each worker owns a contiguous slice of the envs (stepped together as a
+    FlyingBirdVecEnv) and reads actions from / writes observations, rewards and
+    dones to a shared memory block, so only a one-byte command crosses the pipe
+    per worker per step. Finished envs are reset automatically, as in
+    FlyingBirdVecEnv; frame_skip is passed on to the workers' FlyingBirdVecEnvs.
+    """
+
+    def __init__(self, num_envs: int, num_workers=None, seed=None, start_method=None, frame_skip: int = 1):
+        """Start the workers, spreading num_envs as evenly as possible over num_workers"""
+        if num_workers is None:
+            num_workers = mp.cpu_count()
+        num_workers = max(1, min(num_workers, num_envs))
+
+        # gym is only imported here, in the parent, so spawned workers importing this module skip it
+        from gym import spaces
+
+        self.num_envs = num_envs
+        self.num_workers = num_workers
+        self.frame_skip = frame_skip
+        self.action_space = spaces.Discrete(2)
+        self.observation_space = make_observation_space()
+        self.shared = SharedBuffers(num_envs)
+        self.waiting = False
+        self.closed = False
+
+        # Per-worker seeds derived from one SeedSequence so the streams are independent
+        seeds = np.random.SeedSequence(seed).spawn(num_workers)
+        bounds = np.linspace(0, num_envs, num_workers + 1).astype(int)
+
+        ctx = mp.get_context(start_method)
+        self.conns = []
+        self.processes = []
+        for rank in range(num_workers):
+            parent_conn, child_conn = ctx.Pipe()
+            process = ctx.Process(
+                target=_worker,
+                args=(child_conn, self.shared.shm.name, num_envs, bounds[rank], bounds[rank + 1], seeds[rank],
+                      frame_skip),
+                daemon=True,
+            )
+            process.start()
+            child_conn.close()
+            self.conns.append(parent_conn)
+            self.processes.append(process)
+
+    def _broadcast(self, cmd: bytes):
+        """Send a command to every worker"""
+        for conn in self.conns:
+            conn.send_bytes(cmd)
+
+    def _wait_all(self):
+        """Block until every worker has acknowledged its last command"""
+        for conn in self.conns:
+            conn.recv_bytes()
+
+    def reset(self):
+        """Reset all envs and return the (N, obs_dim) initial observations"""
+        self._broadcast(CMD_RESET)
+        self._wait_all()
+        return self.shared.obs.copy()
+
+    def step_async(self, actions):
+        """Publish the actions and tell every worker to step"""
+        self.shared.actions[:] = actions
+        self._broadcast(CMD_STEP)
+        self.waiting = True
+
+    def step_wait(self):
+        """Wait for the workers and return (observations, rewards, dones, infos)"""
+        self._wait_all()
+        self.waiting = False
+
+        dones = self.shared.dones.copy()
+        infos = {'score': self.shared.scores.copy()}
+        if dones.any():
+            final_obs = self.shared.obs.copy()
+            final_obs[dones] = self.shared.final_obs[dones]
+            infos['final_observation'] = final_obs
+        return self.shared.obs.copy(), self.shared.rewards.copy(), dones, infos
+
+    def step(self, actions):
+        """Step every env synchronously"""
+        self.step_async(actions)
+        return self.step_wait()
+
+    def close(self):
+        """Stop the workers and release the shared memory block"""
+        if self.closed:
+            return
+        if self.waiting:
+            self._wait_all()
+        for conn in self.conns:
+            try:
+                conn.send_bytes(CMD_CLOSE)
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self.processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        for conn in self.conns:
+            conn.close()
+        self.shared.close()
+        self.shared.shm.unlink()
+        self.closed = True
+
+    def __del__(self):
+        if not getattr(self, 'closed', True):
+            self.close()
+
+
+if __name__ == "__main__":
+    import time
+
+    num_envs = 256
+    steps = 2000
+    for num_workers in sorted({1, 2, 4, mp.cpu_count()}):
+        env = SubprocVecEnv(num_envs, num_workers=num_workers, seed=0)
+        env.reset()
+        actions = np.zeros(num_envs, dtype=np.int64)
+        start = time.perf_counter()
+        for _ in range(steps):
+            actions[:] = np.random.randint(0, 2, size=num_envs)
+            env.step(actions)
+        elapsed = time.perf_counter() - start
+        env.close()
+        print(f"{num_workers:>3} workers: {num_envs * steps / elapsed:,.0f} env steps/s")
@@ -0,0 +1,230 @@
+# sweep.py
+import argparse
+import contextlib
+import csv
+import itertools
+import json
+import math
+import multiprocessing as mp
+import os
+import time
+import traceback
+import numpy as np
+
+THREADS_PER_TRIAL = 1  # torch threads (and CPUs pinned) per trial
+EVAL_SEEDS = 20  # Greedy evaluation episodes per trained model (0 skips evaluation)
+# train() arguments a sweep may vary; the run options (episodes, output paths, rendering, ...) are set per trial
+HYPERPARAMETERS = ('gamma', 'learning_rate', 'batch_size', 'buffer_size', 'epsilon_decay', 'target_update',
+                   'target_tau', 'update_every', 'updates_per_step', 'frame_skip', 'prioritized', 'tensor_replay',
+                   'compile_loss')
+SUMMARY_COLUMNS = ('trial', 'mean_reward_last_100', 'eval_score_mean', 'eval_score_p50', 'steps', 'steps_per_second',
+                   'elapsed_seconds', 'error')
+TRAIN_METRICS = ('mean_reward_last_100', 'steps', 'steps_per_second')
+EVAL_METRICS = ('eval_score_mean', 'eval_score_p50')
+
+# Per-process state set up by _init_worker
+_cpus = None
+
+
+def _parse_value(text: str):
+    """Parse a command-line value as JSON (numbers, booleans), falling back to the plain string"""
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+def sample_value(rng, space):
+    """Draw one value from a random-search space: a list of choices or {"uniform"|"log_uniform"|"int": [low, high]}"""
+    if isinstance(space, list):
+        return space[rng.integers(len(space))]
+    (kind, (low, high)), = space.items()
+    if kind == 'uniform':
+        return float(rng.uniform(low, high))
+    if kind == 'log_uniform':
+        return float(np.exp(rng.uniform(np.log(low), np.log(high))))
+    if kind == 'int':
+        return int(rng.integers(low, high, endpoint=True))
+    raise ValueError(f"unknown search space {kind!r}")
+
+
+def expand_spec(spec):
+    """Turn a sweep spec into a list of {name: value} trial configurations.
+
+    spec is {"mode": "grid" | "random", "params": {name: space}, "trials": N,
+    "seed": S}. A grid takes every combination of the listed values; a random
+    search draws N configurations (see sample_value). Names are train()
+    keyword arguments listed in HYPERPARAMETERS.
+    """
+    params = spec['params']
+    names = list(params)
+    if spec.get('mode', 'grid') == 'grid':
+        return [dict(zip(names, values)) for values in itertools.product(*(params[name] for name in names))]
+    rng = np.random.default_rng(spec.get('seed'))
+    return [{name: sample_value(rng, params[name]) for name in names} for _ in range(spec['trials'])]
+
+
+def check_names(names):
+    """Raise ValueError for names that are not hyperparameters train() takes"""
+    unknown = [name for name in names if name not in HYPERPARAMETERS]
+    if unknown:
+        raise ValueError(f"cannot sweep {', '.join(unknown)}; choose from {', '.join(HYPERPARAMETERS)}")
+
+
+def available_cpus():
+    """The CPUs this process may run on"""
+    if hasattr(os, 'sched_getaffinity'):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count()))
+
+
+def cpu_slots(num_workers: int, threads: int):
+    """Split the available CPUs into num_workers disjoint sets of `threads` CPUs (wrapping if too few)"""
+    cpus = available_cpus()
+    return [[cpus[(slot * threads + i) % len(cpus)] for i in range(threads)] for slot in range(num_workers)]
+
+
+def _init_worker(slots, counter, threads: int):
+    """Pin this worker to its own CPUs and limit torch to that many threads, so trials don't oversubscribe cores"""
+    global _cpus
+    with counter.get_lock():
+        slot = counter.value
+        counter.value += 1
+    _cpus = slots[slot % len(slots)]
+    if hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, _cpus)
+    import torch
+    torch.set_num_threads(threads)
+    torch.set_num_interop_threads(1)
+
+
+def run_trial(trial: int, overrides, episodes: int, directory: str, eval_seeds: int = EVAL_SEEDS):
+    """Train one configuration in its own directory and return its summary row.
+
+    The model, metrics and training output (train.log) go to the trial
+    directory; checkpointing and plotting are off. A trial that fails gets
+    an 'error' entry and NaN metrics instead of stopping the sweep; its
+    traceback is in train.log.
+    """
+    from train_dqn import train
+
+    workdir = os.path.join(directory, f'trial_{trial:03d}')
+    os.makedirs(workdir, exist_ok=True)
+    model_path = os.path.join(workdir, 'dqn_model.pth')
+    row = {'trial': trial, **overrides}
+    start = time.perf_counter()
+    with open(os.path.join(workdir, 'train.log'), 'w') as log, contextlib.redirect_stdout(log):
+        try:
+            row.update(train(render=False, max_episodes=episodes, metrics_dir=os.path.join(workdir, 'metrics'),
+                             checkpoint_every=0, model_path=model_path, plot=False, **overrides))
+            row['elapsed_seconds'] = time.perf_counter() - start
+            if eval_seeds:
+                from evaluate import evaluate
+                report = evaluate(model_path, eval_seeds, num_workers=1, frame_skip=overrides.get('frame_skip', 1))
+                row['eval_score_mean'] = report['score']['mean']
+                row['eval_score_p50'] = report['score']['p50']
+        except Exception as error:
+            traceback.print_exc(file=log)
+            row['error'] = f'{type(error).__name__}: {error}'
+            row.setdefault('elapsed_seconds', time.perf_counter() - start)
+            for column in TRAIN_METRICS + (EVAL_METRICS if eval_seeds else ()):
+                row.setdefault(column, math.nan)
+    row['cpus'] = _cpus
+    return row
+
+
+def format_table(rows, names):
+    """Return the summary rows as an aligned text table"""
+    columns = ['trial', *names, *(column for column in SUMMARY_COLUMNS[1:] if any(column in row for row in rows))]
+    cells = [columns] + [[_format_cell(row.get(column)) for column in columns] for row in rows]
+    widths = [max(len(line[i]) for line in cells) for i in range(len(columns))]
+    return '\n'.join('  '.join(cell.rjust(width) for cell, width in zip(line, widths)) for line in cells)
+
+
+def _format_cell(value):
+    """Format one table cell compactly"""
+    if isinstance(value, float):
+        return f'{value:.4g}'
+    return '-' if value is None else str(value)
+
+
+def sweep(spec, episodes: int, directory: str = 'sweeps', num_workers=None, threads: int = THREADS_PER_TRIAL,
+          eval_seeds: int = EVAL_SEEDS, start_method='spawn'):
+    """Run every trial of spec in a pool of worker processes and return the summary rows, best first.
+
+    Each worker is pinned to its own `threads` CPUs with torch limited to as
+    many threads; by default there is one worker per such slot. Every trial
+    trains for `episodes` episodes in directory/trial_NNN. The summary is
+    also written to directory/summary.json and directory/summary.csv.
+    """
+    trials = expand_spec(spec)
+    names = list(spec['params'])
+    check_names(names)
+    if num_workers is None:
+        num_workers = max(1, len(available_cpus()) // threads)
+    num_workers = max(1, min(num_workers, len(trials)))
+    os.makedirs(directory, exist_ok=True)
+    directory = os.path.abspath(directory)
+
+    print(f"Running {len(trials)} trials on {num_workers} workers with {threads} thread(s) each...")
+    ctx = mp.get_context(start_method)
+    counter = ctx.Value('i', 0)
+    start = time.perf_counter()
+    with ctx.Pool(num_workers, initializer=_init_worker,
+                  initargs=(cpu_slots(num_workers, threads), counter, threads)) as pool:
+        jobs = [(trial, overrides, episodes, directory, eval_seeds) for trial, overrides in enumerate(trials)]
+        rows = []
+        for row in pool.imap_unordered(_run_trial_star, jobs):
+            rows.append(row)
+            if 'error' in row:
+                print(f"  trial {row['trial']:>3} failed after {row['elapsed_seconds']:.1f} s: {row['error']}")
+            else:
+                print(f"  trial {row['trial']:>3} done in {row['elapsed_seconds']:.1f} s: "
+                      f"mean reward {row['mean_reward_last_100']:.1f}")
+    print(f"Sweep finished in {time.perf_counter() - start:.1f} s")
+
+    # Failed trials (NaN reward) go last
+    rows.sort(key=lambda row: (math.isnan(row['mean_reward_last_100']), -row['mean_reward_last_100'], row['trial']))
+    with open(os.path.join(directory, 'summary.json'), 'w') as f:
+        json.dump(rows, f, indent=2)
+    columns = ['trial', *names, *(column for column in SUMMARY_COLUMNS[1:] if any(column in row for row in rows))]
+    with open(os.path.join(directory, 'summary.csv'), 'w', newline='') as f:
+        # csv quotes the error messages, which may contain commas
+        writer = csv.DictWriter(f, columns, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(rows)
+    return rows
+
+
+def _run_trial_star(job):
+    """Pool helper: unpack the arguments of run_trial"""
+    return run_trial(*job)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train many DQN configurations in parallel and compare them")
+    parser.add_argument('spec', nargs='?', default=None,
+                        help='JSON sweep spec: {"mode": "grid"|"random", "params": {...}, "trials": N, "seed": S}')
+    parser.add_argument('--param', action='append', default=[], metavar='NAME=V1,V2,...',
+                        help="Grid values for one parameter (instead of a spec file); may be repeated")
+    parser.add_argument('--episodes', type=int, default=200, help="Training episodes per trial")
+    parser.add_argument('--workers', type=int, default=None, help="Parallel trials (default: CPUs / --threads)")
+    parser.add_argument('--threads', type=int, default=THREADS_PER_TRIAL, help="torch threads and CPUs per trial")
+    parser.add_argument('--eval-seeds', type=int, default=EVAL_SEEDS,
+                        help="Greedy evaluation episodes per trained model (0 to skip)")
+    parser.add_argument('--dir', default='sweeps', help="Directory for the trial outputs and the summary")
+    args = parser.parse_args()
+
+    if args.spec is not None:
+        with open(args.spec) as f:
+            spec = json.load(f)
+    elif args.param:
+        spec = {'mode': 'grid', 'params': {}}
+        for param in args.param:
+            name, _, values = param.partition('=')
+            spec['params'][name] = [_parse_value(value) for value in values.split(',')]
+    else:
+        parser.error("give a spec file or at least one --param")
+
+    rows = sweep(spec, args.episodes, args.dir, args.workers, args.threads, args.eval_seeds)
+    print(format_table(rows, list(spec['params'])))
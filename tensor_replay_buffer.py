@@ -0,0 +1,68 @@
+# tensor_replay_buffer.py
+import torch
+from replay_buffer import ReplayBuffer
+
+
+class TensorReplayBuffer(ReplayBuffer):
+    """Ring buffer whose columns are preallocated torch tensors, sampled straight into device tensors.
+
+    Storage stays in host memory (pinned when CUDA is available) and is written
+    through NumPy views, so add/add_batch are the ReplayBuffer ones. sample()
+    draws indices with torch.randint and gathers every column with
+    index_select into persistent batch tensors, then copies them to the
+    learner device if it is not the CPU. The returned tensors are reused by
+    the next call to sample().
+    """
+
+    def __init__(self, max_size: int, device='cpu', pin_memory=None):
+        """Initialize the buffer with a max size and the device the batches are consumed on"""
+        super(TensorReplayBuffer, self).__init__(max_size)
+        self.device = torch.device(device)
+        self.pin_memory = torch.cuda.is_available() if pin_memory is None else pin_memory
+        self.tensors = None
+        self._indices = None
+        self._host_batch = None
+        self._device_batch = None
+        self._copy_done = None  # CUDA event marking the end of the last host-to-device copy
+
+    def _allocate(self, state_shape):
+        """Allocate the storage columns as host tensors and expose NumPy views of them for writes"""
+        def column(shape, dtype):
+            return torch.zeros((self.max_size, *shape), dtype=dtype, pin_memory=self.pin_memory)
+
+        self.tensors = (
+            column(state_shape, torch.float32),
+            column((), torch.int64),
+            column((), torch.float32),
+            column(state_shape, torch.float32),
+            column((), torch.float32),
+        )
+        self.states, self.actions, self.rewards, self.next_states, self.dones = (t.numpy() for t in self.tensors)
+
+    def _allocate_batch(self, batch_size: int):
+        """Allocate the persistent index and batch tensors for batch_size samples"""
+        self._batch_size = batch_size
+        self._indices = torch.empty(batch_size, dtype=torch.int64)
+        self._host_batch = tuple(
+            torch.empty((batch_size, *t.shape[1:]), dtype=t.dtype, pin_memory=self.pin_memory) for t in self.tensors)
+        if self.device.type == 'cpu':
+            self._device_batch = self._host_batch
+        else:
+            self._device_batch = tuple(torch.empty_like(t, device=self.device) for t in self._host_batch)
+            self._copy_done = torch.cuda.Event()
+
+    def sample(self, batch_size: int):
+        """Sample a batch as (states, actions, rewards, next_states, dones) tensors on the learner device"""
+        if self._indices is None or self._batch_size != batch_size:
+            self._allocate_batch(batch_size)
+        if self._copy_done is not None:
+            # The previous asynchronous copy must finish reading the host batch before it is overwritten
+            self._copy_done.synchronize()
+        torch.randint(self.count, (batch_size,), out=self._indices)
+        for column, host, dev in zip(self.tensors, self._host_batch, self._device_batch):
+            torch.index_select(column, 0, self._indices, out=host)
+            if dev is not host:
+                dev.copy_(host, non_blocking=True)
+        if self._copy_done is not None:
+            self._copy_done.record()
+        return self._device_batch
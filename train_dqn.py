@@ -1,15 +1,21 @@
 # train_dqn.py
 
+import argparse
+from collections import deque
 import torch
 import torch.optim as optim
 import numpy as np
-import time
-import random
-from replay_buffer import ReplayBuffer
+from replay_buffer import ReplayBuffer, PrioritizedReplayBuffer
+from tensor_replay_buffer import TensorReplayBuffer
+from memmap_replay_buffer import MemmapReplayBuffer
 from dqn_network import DQN
+from dqn_actor import DQNActor
 from flying_bird_env import FlyingBirdEnv
-from visualize import plot_rewards, plot_losses
-import config
+from visualize import plot_rewards_from_log, plot_losses_from_log
+from pacing import make_clock, PACING_MODES
+from profiler import PhaseProfiler
+from metrics import MetricsWriter
+from checkpoint import AsyncCheckpointer, latest_checkpoint, load_checkpoint, rng_state, set_rng_state
 
 # Hyperparameters
 GAMMA = 0.99  # Discount factor
@@ -19,106 +25,382 @@ EPSILON_DECAY = 500  # Number of steps for epsilon to decay
 BATCH_SIZE = 64  # Size of mini-batches for training
 BUFFER_SIZE = 10000  # Max size of the replay buffer
 LEARNING_RATE = 0.0005  # Learning rate for the DQN
-TARGET_UPDATE = 100  # How often to update the target network
+TARGET_UPDATE = 100  # How often (in env steps) to copy the online network into the target network
+TARGET_TAU = 0.0  # Polyak rate of a soft target update after every gradient step (0 uses the TARGET_UPDATE copy)
+UPDATE_EVERY = 1  # Env steps between learner phases (E)
+UPDATES_PER_STEP = 1  # Gradient steps per learner phase (G); the update-to-data ratio is G / E
 MAX_EPISODES = 10000  # Total number of episodes for training
+METRICS_AGGREGATE = 100  # Number of updates averaged into each row of the loss log
+PER_ALPHA = 0.6  # How strongly prioritized replay favours high TD-error transitions
+PER_BETA_START = 0.4  # Initial importance-sampling correction for prioritized replay
+PER_BETA_FRAMES = 100000  # Number of steps for beta to anneal to 1
+CHECKPOINT_EVERY = 100  # Number of episodes between checkpoints
+CHECKPOINT_KEEP = 3  # Number of most recent checkpoints kept on disk
 
 device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
 
-def epsilon_by_frame(frame_idx):
-    """Decay epsilon over time"""
-    return EPSILON_END + (EPSILON_START - EPSILON_END) * np.exp(-1. * frame_idx / EPSILON_DECAY)
+def epsilon_by_frame(frame_idx, decay=EPSILON_DECAY):
+    """Decay epsilon over time, by a factor e every decay steps"""
+    return EPSILON_END + (EPSILON_START - EPSILON_END) * np.exp(-1. * frame_idx / decay)
 
-def compute_td_loss(batch, model, target_model, optimizer):
-    """Compute the loss between predicted and target Q-values"""
-    states, actions, rewards, next_states, dones = batch
-    states = torch.FloatTensor(states).to(device)
-    next_states = torch.FloatTensor(next_states).to(device)
-    actions = torch.LongTensor(actions).to(device)
-    rewards = torch.FloatTensor(rewards).to(device)
-    dones = torch.FloatTensor(dones).to(device)
+def beta_by_frame(frame_idx):
+    """Anneal the prioritized replay importance-sampling exponent towards 1"""
+    return min(1.0, PER_BETA_START + frame_idx * (1.0 - PER_BETA_START) / PER_BETA_FRAMES)
+
+def td_loss(model, target_model, states, actions, rewards, next_states, dones, weights=None, gamma=GAMMA):
+    """Return the (importance-weighted) mean squared TD error and the detached per-sample TD errors
 
+    Pure tensor code with no side effects, so it can be wrapped in torch.compile.
+    """
     # Get the Q-values for the actions taken
     q_values = model(states)
     next_q_values = target_model(next_states)
 
     q_value = q_values.gather(1, actions.unsqueeze(1)).squeeze(1)
     next_q_value = next_q_values.max(1)[0]
-    expected_q_value = rewards + GAMMA * next_q_value * (1 - dones)
+    expected_q_value = rewards + gamma * next_q_value * (1 - dones)
+
+    # Loss function: Mean Squared Error (MSE), importance-weighted for prioritized replay
+    td_errors = q_value - expected_q_value.detach()
+    if weights is None:
+        loss = td_errors.pow(2).mean()
+    else:
+        loss = (weights * td_errors.pow(2)).mean()
+    return loss, td_errors.detach()
+
+def compute_td_loss(batch, model, target_model, optimizer, weights=None, loss_fn=td_loss, profiler=None,
+                    gamma=GAMMA):
+    """Compute the loss between predicted and target Q-values and take one optimizer step
+
+    The batch columns may be NumPy arrays or tensors already on the device (TensorReplayBuffer);
+    torch.as_tensor only copies when the dtype or device differ. weights are optional
+    per-sample importance-sampling weights (prioritized replay). loss_fn is td_loss or a
+    torch.compile'd version of it; profiler, if given, times the phases of the update under learn/*.
+    gamma is the discount factor of the TD targets.
+    Returns the loss and the detached per-sample TD errors.
+    """
+    prof = profiler
+    if prof is not None:
+        t = prof.now()
+    states, actions, rewards, next_states, dones = batch
+    states = torch.as_tensor(states, dtype=torch.float32, device=device)
+    next_states = torch.as_tensor(next_states, dtype=torch.float32, device=device)
+    actions = torch.as_tensor(actions, dtype=torch.int64, device=device)
+    rewards = torch.as_tensor(rewards, dtype=torch.float32, device=device)
+    dones = torch.as_tensor(dones, dtype=torch.float32, device=device)
+    if weights is not None:
+        weights = torch.as_tensor(weights, dtype=torch.float32, device=device)
+    if prof is not None:
+        t = prof.lap('learn/to_tensor', t)
 
-    # Loss function: Mean Squared Error (MSE)
-    loss = (q_value - expected_q_value.detach()).pow(2).mean()
+    loss, td_errors = loss_fn(model, target_model, states, actions, rewards, next_states, dones, weights, gamma)
+    if prof is not None:
+        t = prof.lap('learn/forward', t)
 
-    optimizer.zero_grad()
+    # Dropping the gradients (instead of zero-filling them) lets backward() write fresh ones
+    optimizer.zero_grad(set_to_none=True)
     loss.backward()
+    if prof is not None:
+        t = prof.lap('learn/backward', t)
     optimizer.step()
+    if prof is not None:
+        prof.lap('learn/optimizer', t)
+
+    return loss, td_errors
+
+def hard_update(target_model, model):
+    """Copy the parameters of model into target_model in place, one fused op for all of them"""
+    with torch.no_grad():
+        torch._foreach_copy_(list(target_model.parameters()), list(model.parameters()))
+
+def soft_update(target_model, model, tau):
+    """Move the target parameters a fraction tau towards the online ones (Polyak averaging), in place"""
+    with torch.no_grad():
+        torch._foreach_lerp_(list(target_model.parameters()), list(model.parameters()), tau)
+
+def train(render=False, pacing=None, prioritized=False, tensor_replay=False, profile_path=None,
+          metrics_dir='metrics', checkpoint_dir='checkpoints', checkpoint_every=CHECKPOINT_EVERY,
+          checkpoint_replay=False, resume=False, replay_dir=None, buffer_size=BUFFER_SIZE, render_fps=None,
+          frame_skip=1, update_every=UPDATE_EVERY, updates_per_step=UPDATES_PER_STEP, target_tau=TARGET_TAU,
+          compile_loss=False, scroll_background=True, max_episodes=MAX_EPISODES, gamma=GAMMA,
+          learning_rate=LEARNING_RATE, batch_size=BATCH_SIZE, epsilon_decay=EPSILON_DECAY,
+          target_update=TARGET_UPDATE, model_path='dqn_model.pth', plot=True):
+    """Main DQN training loop
 
-    return loss
+    Trains for max_episodes episodes with discount gamma, Adam at
+    learning_rate, mini-batches of batch_size and epsilon decaying over
+    epsilon_decay steps (the defaults are the module constants).
 
-def train():
-    """Main DQN training loop"""
-    env = FlyingBirdEnv(render=False)
-    replay_buffer = ReplayBuffer(BUFFER_SIZE)
+    pacing selects how fast environment steps run: 'realtime', 'fixed'
+    (config.FPS_TRAINING steps per second) or 'turbo' (unthrottled). By default
+    rendered runs are real time and headless runs are turbo; render_fps caps
+    the drawn frame rate separately, so e.g. a turbo run can still be watched.
+    scroll_background=False renders over a still background, redrawing only what moves.
+    frame_skip makes every agent decision play that many frames (see FlyingBirdEnv).
+    The learner takes updates_per_step gradient steps every update_every env
+    steps. With target_tau > 0 the target network follows the online one by
+    Polyak averaging after every gradient step, otherwise it is copied every
+    target_update env steps. compile_loss runs the loss through torch.compile.
+    prioritized switches from uniform to prioritized experience replay, and
+    tensor_replay keeps the (uniform) replay storage in torch tensors.
+    replay_dir instead memory-maps it from files in that directory, reusing
+    any transitions a previous run left there; at most one of these three
+    may be given. buffer_size is the replay capacity. profile_path turns on per-phase timing of the loop and of
+    env.step(), dumped there as JSON lines.
+    Losses and episode rewards are streamed to CSV files in metrics_dir.
+    Every checkpoint_every episodes the networks, optimizer, counters, env and RNG
+    states (and the replay buffer if checkpoint_replay, unless it is memory-mapped
+    and flushed to replay_dir instead) are written to
+    checkpoint_dir by a background thread; resume continues from the latest
+    checkpoint there. A fresh run overwrites the metrics; a resumed one drops
+    the rows logged after the checkpoint and continues the log from there.
+    The trained weights are saved to model_path, and plot draws the reward
+    and loss curves from the metrics at the end.
+    Returns a summary of the run (episodes, steps, steps per second, recent mean reward).
+    """
+    if prioritized + tensor_replay + (replay_dir is not None) > 1:
+        raise ValueError("prioritized, tensor_replay and replay_dir select different replay buffers; use at most one")
+    prof = PhaseProfiler(dump_path=profile_path) if profile_path else None
+    env = FlyingBirdEnv(render=render, profiler=prof, render_fps=render_fps, frame_skip=frame_skip,
+                        scroll_background=scroll_background)
+    clock = make_clock(pacing, render=render)
+    if prioritized:
+        replay_buffer = PrioritizedReplayBuffer(buffer_size, alpha=PER_ALPHA)
+    elif tensor_replay:
+        replay_buffer = TensorReplayBuffer(buffer_size, device=device)
+    elif replay_dir is not None:
+        replay_buffer = MemmapReplayBuffer(buffer_size, replay_dir)
+    else:
+        replay_buffer = ReplayBuffer(buffer_size)
 
     model = DQN(env.observation_space.shape[0], env.action_space.n).to(device)
     target_model = DQN(env.observation_space.shape[0], env.action_space.n).to(device)
     target_model.load_state_dict(model.state_dict())
 
-    optimizer = optim.Adam(model.parameters(), lr=LEARNING_RATE)
-    
-    print("Training started...")
+    optimizer = optim.Adam(model.parameters(), lr=learning_rate)
+    actor = DQNActor(model, env.action_space.n, device)
+
+    loss_fn = torch.compile(td_loss) if compile_loss else td_loss
 
+    start_episode = 0
     frame_idx = 0
-    all_rewards = []
-    cumulative_rewards = []
-    losses = []
+    recent_rewards = deque(maxlen=100)
+    cumulative_reward = 0
+    resume_at = None
 
-    for episode in range(MAX_EPISODES):
+    checkpoint_path = latest_checkpoint(checkpoint_dir) if resume else None
+    if checkpoint_path is not None:
+        checkpoint = load_checkpoint(checkpoint_path)
+        model.load_state_dict(checkpoint['model'])
+        target_model.load_state_dict(checkpoint['target_model'])
+        optimizer.load_state_dict(checkpoint['optimizer'])
+        if 'replay_buffer' in checkpoint:
+            saved_type, buffer_type = checkpoint.get('replay_buffer_type'), type(replay_buffer).__name__
+            if saved_type is not None and saved_type != buffer_type:
+                raise ValueError(f"{checkpoint_path} holds a {saved_type}, which cannot be loaded into a {buffer_type}; "
+                                 f"resume with the same replay options")
+            replay_buffer.load_state_dict(checkpoint['replay_buffer'])
+        set_rng_state(checkpoint['rng'], actor.rng)
+        env.set_state(checkpoint['env'])
+        start_episode = checkpoint['episode']
+        frame_idx = checkpoint['frame_idx']
+        cumulative_reward = checkpoint['cumulative_reward']
+        recent_rewards.extend(checkpoint['recent_rewards'])
+        resume_at = (start_episode, checkpoint['metrics_updates'])
+        print(f"Resumed from {checkpoint_path} at episode {start_episode}, step {frame_idx}")
+    elif resume:
+        print(f"No checkpoint in {checkpoint_dir}, starting from scratch")
+    metrics = MetricsWriter(metrics_dir, aggregate_every=METRICS_AGGREGATE, device=device, resume_at=resume_at)
+    checkpointer = AsyncCheckpointer(checkpoint_dir, keep=CHECKPOINT_KEEP) if checkpoint_every else None
+
+    print("Training started...")
+
+    for episode in range(start_episode, max_episodes):
         state = env.reset()
         episode_reward = 0
         done = False
 
         while not done:
+            if prof is not None:
+                t = prof.now()
+
             # Select action using epsilon-greedy policy
-            epsilon = epsilon_by_frame(frame_idx)
-            if random.random() > epsilon:
-                action = model(torch.FloatTensor(state).to(device)).argmax().item()
-            else:
-                action = env.action_space.sample()  # Random action (exploration)
+            epsilon = epsilon_by_frame(frame_idx, epsilon_decay)
+            action = int(actor.act(state, epsilon)[0])
+            if prof is not None:
+                t = prof.lap('act', t)
 
             next_state, reward, done, _ = env.step(action)
+            if prof is not None:
+                t = prof.lap('env_step', t)
+            if render:
+                env.render()
+                if prof is not None:
+                    t = prof.lap('render', t)
             replay_buffer.add((state, action, reward, next_state, done))
+            if prof is not None:
+                t = prof.lap('replay_add', t)
 
             state = next_state
             episode_reward += reward
             frame_idx += 1
 
-            if replay_buffer.size() > BATCH_SIZE:
-                loss = compute_td_loss(replay_buffer.sample(BATCH_SIZE), model, target_model, optimizer)
-                losses.append(loss.item())
+            # Learner phase: updates_per_step gradient steps every update_every env steps
+            if replay_buffer.size() > batch_size and frame_idx % update_every == 0:
+                for _ in range(updates_per_step):
+                    if prioritized:
+                        *batch, weights, indices = replay_buffer.sample(batch_size, beta_by_frame(frame_idx))
+                        if prof is not None:
+                            t = prof.lap('sample', t)
+                        loss, td_errors = compute_td_loss(batch, model, target_model, optimizer, weights, loss_fn, prof, gamma)
+                        if prof is not None:
+                            t = prof.lap('learn', t)  # The whole update; learn/* break it down
+                        replay_buffer.update_priorities(indices, td_errors.cpu().numpy())
+                        if prof is not None:
+                            t = prof.lap('update_priorities', t)
+                    else:
+                        batch = replay_buffer.sample(batch_size)
+                        if prof is not None:
+                            t = prof.lap('sample', t)
+                        loss, _ = compute_td_loss(batch, model, target_model, optimizer, loss_fn=loss_fn, profiler=prof,
+                                                  gamma=gamma)
+                        if prof is not None:
+                            t = prof.lap('learn', t)
+                    metrics.log_loss(loss)
+                    if prof is not None:
+                        t = prof.lap('metrics', t)
+                    if target_tau:
+                        soft_update(target_model, model, target_tau)
+                        if prof is not None:
+                            t = prof.lap('target_sync', t)
 
-            if frame_idx % TARGET_UPDATE == 0:
-                target_model.load_state_dict(model.state_dict())
+            if not target_tau and frame_idx % target_update == 0:
+                hard_update(target_model, model)
+                if prof is not None:
+                    t = prof.lap('target_sync', t)
 
             # Control the step speed during training
-            time.sleep(1 / config.FPS_TRAINING)
+            clock.tick()
+            if prof is not None:
+                prof.lap('pacing', t)
 
-        all_rewards.append(episode_reward)
-        if len(cumulative_rewards) == 0:
-            cumulative_rewards.append(episode_reward)
-        else:
-            cumulative_rewards.append(cumulative_rewards[-1] + episode_reward)
+        recent_rewards.append(episode_reward)
+        cumulative_reward += episode_reward
+        steps_per_second = clock.steps_per_second()
+        metrics.log_episode(episode, frame_idx, episode_reward, cumulative_reward, epsilon, steps_per_second)
 
-        print(f"Episode {episode}, Reward: {episode_reward}, Cumulative Reward: {cumulative_rewards[-1]}, Epsilon: {epsilon}")
+        print(f"Episode {episode}, Reward: {episode_reward}, Cumulative Reward: {cumulative_reward}, Epsilon: {epsilon}, Steps/s: {steps_per_second:.1f}")
+        if checkpointer is not None and (episode + 1) % checkpoint_every == 0:
+            # Episodes end with a reset, so the next episode starts from the restored RNG states alone
+            if prof is not None:
+                t = prof.now()
+            checkpoint = {
+                'episode': episode + 1,
+                'frame_idx': frame_idx,
+                'epsilon': epsilon,
+                'cumulative_reward': cumulative_reward,
+                'recent_rewards': list(recent_rewards),
+                'metrics_updates': metrics.updates,
+                'model': model.state_dict(),
+                'target_model': target_model.state_dict(),
+                'optimizer': optimizer.state_dict(),
+                'rng': rng_state(actor.rng),
+                'env': env.get_state(),
+            }
+            if checkpoint_replay and replay_dir is None:
+                # A memory-mapped buffer persists itself in replay_dir (flushed below); copying it would load it into RAM
+                checkpoint['replay_buffer'] = replay_buffer.state_dict()
+                checkpoint['replay_buffer_type'] = type(replay_buffer).__name__
+            checkpointer.save(checkpoint, episode + 1)
+            if replay_dir is not None:
+                replay_buffer.flush()
+            if prof is not None:
+                prof.lap('checkpoint', t)
+        if prof is not None:
+            prof.maybe_dump()
 
-    # Visualize rewards and losses
-    plot_rewards(all_rewards, cumulative_rewards)
-    plot_losses(losses)
+    print(f"Training finished: {clock.total_steps} steps at {clock.average_steps_per_second():.1f} steps/s")
+    if prof is not None:
+        prof.dump()
+        print(prof.report())
+
+    # Visualize rewards and losses from the metrics log
+    if checkpointer is not None:
+        checkpointer.close()
+    if replay_dir is not None:
+        replay_buffer.close()
+    metrics.close()
+    if plot:
+        plot_rewards_from_log(metrics_dir)
+        plot_losses_from_log(metrics_dir)
     
-    torch.save(model.state_dict(), 'dqn_model.pth')
+    torch.save(model.state_dict(), model_path)
     model = DQN(env.observation_space.shape[0], env.action_space.n).to(device)
-    model.load_state_dict(torch.load('dqn_model.pth'))
+    model.load_state_dict(torch.load(model_path))
 
     env.close()
 
+    return {
+        'episodes': max_episodes,
+        'steps': frame_idx,
+        'steps_per_second': clock.average_steps_per_second(),
+        'mean_reward_last_100': float(np.mean(recent_rewards)) if recent_rewards else 0.0,
+    }
+
 if __name__ == "__main__":
-    train()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Train a DQN agent on the Flying Bird environment")
+    parser.add_argument('--render', action='store_true', help="Render the game window while training")
+    parser.add_argument('--render-fps', type=int, default=None,
+                        help="Draw at most this many frames per second, independently of the step pacing")
+    parser.add_argument('--static-background', action='store_true',
+                        help="Keep the rendered background still and redraw only the moving sprites")
+    parser.add_argument('--frame-skip', type=int, default=1,
+                        help="Repeat every action for this many frames, summing their rewards")
+    parser.add_argument('--pacing', choices=PACING_MODES, default=None,
+                        help="Step pacing (default: realtime when rendering, turbo otherwise)")
+    parser.add_argument('--prioritized', action='store_true', help="Use prioritized experience replay")
+    parser.add_argument('--tensor-replay', action='store_true', help="Keep the replay buffer in torch tensors")
+    parser.add_argument('--replay-dir', default=None,
+                        help="Memory-map the replay buffer from this directory and keep it for later runs")
+    parser.add_argument('--buffer-size', type=int, default=BUFFER_SIZE, help="Replay buffer capacity")
+    parser.add_argument('--profile', default=None, metavar='PATH',
+                        help="Time each phase of the loop and append periodic summaries to PATH (JSON lines)")
+    parser.add_argument('--metrics-dir', default='metrics', help="Directory for the streamed loss and episode logs")
+    parser.add_argument('--checkpoint-dir', default='checkpoints', help="Directory for periodic training checkpoints")
+    parser.add_argument('--checkpoint-every', type=int, default=CHECKPOINT_EVERY,
+                        help="Episodes between checkpoints (0 disables checkpointing)")
+    parser.add_argument('--checkpoint-replay', action='store_true', help="Include the replay buffer in checkpoints")
+    parser.add_argument('--resume', action='store_true', help="Continue from the latest checkpoint in --checkpoint-dir")
+    parser.add_argument('--update-every', type=int, default=UPDATE_EVERY, help="Env steps between learner phases")
+    parser.add_argument('--updates-per-step', type=int, default=UPDATES_PER_STEP,
+                        help="Gradient steps per learner phase")
+    parser.add_argument('--target-tau', type=float, default=TARGET_TAU,
+                        help="Polyak rate for soft target updates (0: copy every TARGET_UPDATE steps)")
+    parser.add_argument('--compile', action='store_true', help="Run the TD loss through torch.compile")
+    parser.add_argument('--actors', type=int, default=0,
+                        help="Train with this many actor processes feeding an asynchronous learner (see actor_learner.py)")
+    args = parser.parse_args()
+    replay_options = [option for option, given in (('--prioritized', args.prioritized),
+                                                    ('--tensor-replay', args.tensor_replay),
+                                                    ('--replay-dir', args.replay_dir is not None)) if given]
+    if len(replay_options) > 1:
+        parser.error(f"{', '.join(replay_options)} select different replay buffers; use at most one")
+    if args.actors:
+        # The asynchronous learner only takes the options below; refuse the others rather than ignore them
+        unsupported = [f"--{dest.replace('_', '-')}" for dest in (
+            'render', 'render_fps', 'static_background', 'pacing', 'prioritized', 'tensor_replay', 'replay_dir',
+            'profile', 'checkpoint_dir', 'checkpoint_every', 'checkpoint_replay', 'resume', 'update_every',
+            'updates_per_step', 'target_tau', 'compile') if getattr(args, dest) != parser.get_default(dest)]
+        if unsupported:
+            parser.error(f"--actors cannot be combined with {', '.join(unsupported)}")
+        from actor_learner import train_async
+        train_async(num_actors=args.actors, buffer_size=args.buffer_size, metrics_dir=args.metrics_dir,
+                    frame_skip=args.frame_skip)
+    else:
+        train(render=args.render, pacing=args.pacing, prioritized=args.prioritized, tensor_replay=args.tensor_replay,
+              profile_path=args.profile, metrics_dir=args.metrics_dir, checkpoint_dir=args.checkpoint_dir,
+              checkpoint_every=args.checkpoint_every, checkpoint_replay=args.checkpoint_replay, resume=args.resume,
+              replay_dir=args.replay_dir, buffer_size=args.buffer_size, render_fps=args.render_fps,
+              frame_skip=args.frame_skip, update_every=args.update_every, updates_per_step=args.updates_per_step,
+              target_tau=args.target_tau, compile_loss=args.compile,
+              scroll_background=not args.static_background)
\ No newline at end of file
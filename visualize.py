@@ -1,35 +1,109 @@
 # visualize.py
-import matplotlib.pyplot as plt
+import argparse
+import os
+import numpy as np
 
-def plot_rewards(all_rewards, cumulative_rewards):
-    """Plot both rewards per episode and cumulative rewards over episodes"""
+# matplotlib is imported inside the plotting functions, so importing this module (as train_dqn does)
+# does not load it in runs that never plot
+
+def read_metrics(path):
+    """Read a metrics CSV written by MetricsWriter into {column: array}.
+
+    Safe to call while training is still writing: a partially written last
+    line is ignored.
+    """
+    with open(path) as f:
+        text = f.read()
+    lines = text.split('\n')
+    header, rows = lines[0].split(','), [line for line in lines[1:-1] if line]  # lines[-1] is '' or partial
+    data = np.array([row.split(',') for row in rows], dtype=np.float64).reshape(len(rows), len(header))
+    return {column: data[:, i] for i, column in enumerate(header)}
+
+
+def downsample(x, y, max_points: int):
+    """Average consecutive points into at most max_points buckets"""
+    if len(y) <= max_points:
+        return x, y
+    edges = np.linspace(0, len(y), max_points + 1).astype(np.int64)
+    counts = np.diff(edges)
+    return (np.add.reduceat(x, edges[:-1]) / counts, np.add.reduceat(y, edges[:-1]) / counts)
+
+
+def plot_rewards_from_log(log_dir, max_points: int = 2000, show: bool = True):
+    """Plot rewards per episode and cumulative rewards from a metrics log directory"""
+    import matplotlib.pyplot as plt
+    episodes = read_metrics(os.path.join(log_dir, 'episodes.csv'))
     plt.figure(figsize=(12, 6))
 
-    # Plot rewards per episode
     plt.subplot(1, 2, 1)
-    plt.plot(all_rewards, label="Rewards Per Episode")
+    plt.plot(*downsample(episodes['episode'], episodes['reward'], max_points), label="Rewards Per Episode")
     plt.title("Rewards Per Episode")
     plt.xlabel("Episode")
     plt.ylabel("Reward")
     plt.legend()
 
-    # Plot cumulative rewards
     plt.subplot(1, 2, 2)
-    plt.plot(cumulative_rewards, label="Cumulative Rewards", color='green')
+    plt.plot(*downsample(episodes['episode'], episodes['cumulative_reward'], max_points),
+             label="Cumulative Rewards", color='green')
     plt.title("Cumulative Rewards")
     plt.xlabel("Episode")
     plt.ylabel("Cumulative Reward")
     plt.legend()
 
     plt.tight_layout()
-    plt.show()
+    if show:
+        plt.show()
+
 
-def plot_losses(losses):
-    """Plot the loss over time (training steps)"""
+def plot_losses_from_log(log_dir, max_points: int = 2000, show: bool = True):
+    """Plot the aggregated loss over training steps from a metrics log directory"""
+    import matplotlib.pyplot as plt
+    losses = read_metrics(os.path.join(log_dir, 'losses.csv'))
     plt.figure(figsize=(12, 6))
-    plt.plot(losses, label="Loss")
+    plt.plot(*downsample(losses['update'], losses['mean'], max_points), label="Loss")
     plt.title("Loss Per Training Step")
     plt.xlabel("Training Step")
     plt.ylabel("Loss")
     plt.legend()
-    plt.show()
\ No newline at end of file
+    if show:
+        plt.show()
+
+
+def follow(log_dir, interval: float = 5.0, max_points: int = 2000):
+    """Keep redrawing rewards and losses from a log directory that is still being written"""
+    import matplotlib.pyplot as plt
+    plt.ion()
+    figure = plt.figure(figsize=(12, 8))
+    while plt.fignum_exists(figure.number):
+        figure.clear()
+        episodes = read_metrics(os.path.join(log_dir, 'episodes.csv'))
+        losses = read_metrics(os.path.join(log_dir, 'losses.csv'))
+
+        ax = figure.add_subplot(2, 1, 1)
+        ax.plot(*downsample(episodes['episode'], episodes['reward'], max_points), label="Rewards Per Episode")
+        ax.set_xlabel("Episode")
+        ax.set_ylabel("Reward")
+        ax.legend()
+
+        ax = figure.add_subplot(2, 1, 2)
+        ax.plot(*downsample(losses['update'], losses['mean'], max_points), label="Loss")
+        ax.set_xlabel("Training Step")
+        ax.set_ylabel("Loss")
+        ax.legend()
+
+        figure.tight_layout()
+        plt.pause(interval)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Plot training metrics written by train_dqn.py")
+    parser.add_argument('log_dir', help="Metrics directory (containing episodes.csv and losses.csv)")
+    parser.add_argument('--follow', action='store_true', help="Keep refreshing while training runs")
+    parser.add_argument('--interval', type=float, default=5.0, help="Refresh interval in seconds for --follow")
+    parser.add_argument('--max-points', type=int, default=2000, help="Downsample curves to at most this many points")
+    args = parser.parse_args()
+    if args.follow:
+        follow(args.log_dir, args.interval, args.max_points)
+    else:
+        plot_rewards_from_log(args.log_dir, args.max_points, show=False)
+        plot_losses_from_log(args.log_dir, args.max_points)